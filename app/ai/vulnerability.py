@@ -129,12 +129,7 @@ class VulnerabilityDetector:
         
         for func in module.functions:
             if func.is_entry:
-                has_signer = any(
-                    "signer" in param.lower() or "&signer" in param.lower()
-                    for param in func.params
-                )
-                
-                if not has_signer:
+                if not func.has_signer:
                     vulns.append(Vulnerability(
                         vuln_type=VulnerabilityType.MISSING_SIGNER,
                         severity=VulnerabilitySeverity.HIGH,
@@ -304,8 +299,7 @@ class VulnerabilityDetector:
         for func in coin_functions:
             # Entry functions dealing with coins should have signer
             if func.is_entry:
-                has_signer = any("signer" in p.lower() for p in func.params)
-                if not has_signer:
+                if not func.has_signer:
                     vulns.append(Vulnerability(
                         vuln_type=VulnerabilityType.ACCESS_CONTROL,
                         severity=VulnerabilitySeverity.CRITICAL,
@@ -0,0 +1,39 @@
+"""
+JSON Responses
+
+orjson-rendered response for routes that return plain dicts.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def _encode_default(obj: Any) -> Any:
+    """Convert the types orjson does not serialize natively."""
+    # Static listings are shared as read-only MappingProxyType views
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class OrjsonResponse(Response):
+    """
+    JSON response rendered with orjson.
+    
+    Routes without a response_model return this directly, so FastAPI
+    passes it through instead of running jsonable_encoder and stdlib json
+    over the payload. Routes with a response_model keep the default class,
+    which lets FastAPI serialize them through Pydantic.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content, default=_encode_default)
@@ -7,11 +7,12 @@ Enhanced endpoints for On-Demand.io AI agents with advanced features.
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 import json
 
 from app.core.ondemand_agents import get_agent_manager
+from app.api.responses import OrjsonResponse
 
 
 router = APIRouter(prefix="/agents", tags=["AI Agents"])
@@ -26,6 +27,7 @@ class ChatRequest(BaseModel):
     context: Optional[Dict[str, Any]] = Field(None, description="Optional context (code, vulnerabilities)")
     session_id: Optional[str] = Field(None, description="Existing session ID for conversation continuity")
     model: Optional[str] = Field("gpt4o", description="AI model to use (gpt4o, claude, grok, gemini)")
+    user_id: Optional[str] = Field(None, description="Stable user ID; reuses that user's session with the agent")
 
 
 class MultiAgentRequest(BaseModel):
@@ -33,6 +35,8 @@ class MultiAgentRequest(BaseModel):
     code: str = Field(..., description="Smart contract source code")
     language: str = Field("move", description="Programming language (move, solidity, rust)")
     agents: Optional[List[str]] = Field(None, description="Specific agents to use (default: all)")
+    mode: Literal["per_agent", "fused"] = Field("per_agent", description="per_agent: one session per agent; fused: all agents in a single query")
+    prompt_mode: Optional[Literal["full", "compact"]] = Field(None, description="System prompt variant (default: server setting)")
 
 
 class QuickAnalysisRequest(BaseModel):
@@ -71,13 +75,13 @@ async def list_agents():
     agent_manager = get_agent_manager()
     agents = agent_manager.get_all_agents()
     
-    return {
+    return OrjsonResponse({
         "agents": agents,
         "total": len(agents),
         "powered_by": "On-Demand.io",
         "available_models": list(agent_manager.ENDPOINTS.keys()),
         "description": "6 specialized AI agents for blockchain security analysis"
-    }
+    })
 
 
 @router.get("/info/{agent_id}")
@@ -96,7 +100,7 @@ async def get_agent_info(agent_id: str):
     if not info:
         raise HTTPException(status_code=404, detail=f"Agent not found: {agent_id}")
     
-    return info
+    return OrjsonResponse(info)
 
 
 @router.post("/chat", response_model=AgentResponse)
@@ -126,7 +130,8 @@ async def chat_with_agent(request: ChatRequest):
             message=request.message,
             context=request.context,
             session_id=request.session_id,
-            model=request.model or "gpt4o"
+            model=request.model or "gpt4o",
+            user_id=request.user_id
         )
         
         return result
@@ -158,10 +163,12 @@ async def analyze_with_multiple_agents(request: MultiAgentRequest):
         result = await agent_manager.analyze_with_all_agents(
             code=request.code,
             language=request.language,
-            include_agents=request.agents
+            include_agents=request.agents,
+            mode=request.mode,
+            prompt_mode=request.prompt_mode
         )
         
-        return result
+        return OrjsonResponse(result)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Multi-agent analysis failed: {str(e)}")
@@ -211,12 +218,12 @@ async def quick_analysis(request: QuickAnalysisRequest):
             context={"code": request.code, "language": request.language}
         )
         
-        return {
+        return OrjsonResponse({
             "focus": request.focus,
             "agent_used": agent_id,
             "analysis": result,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Quick analysis failed: {str(e)}")
@@ -267,13 +274,13 @@ Be strict in scoring. Any critical vulnerability should result in a score above
         except:
             pass
         
-        return {
+        return OrjsonResponse({
             "success": True,
             "threat_assessment": threat_data,
             "raw_analysis": response_text if not threat_data else None,
             "agent_response": result,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Threat analysis failed: {str(e)}")
@@ -317,10 +324,10 @@ Format your response with clear sections for:
             context=combined_context
         )
         
-        return {
+        return OrjsonResponse({
             "comparison": result,
             "timestamp": datetime.now().isoformat()
-        }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
@@ -368,12 +375,12 @@ async def get_available_models():
         }
     }
     
-    return {
+    return OrjsonResponse({
         "models": model_descriptions,
         "default": "gpt4o",
         "recommended_for_audit": "gpt4o",
         "recommended_for_quick": "grok"
-    }
+    })
 
 
 @router.get("/stats")
@@ -383,7 +390,7 @@ async def get_agent_stats():
     """
     agent_manager = get_agent_manager()
     
-    return {
+    return OrjsonResponse({
         "total_agents": len(agent_manager.AGENTS),
         "available_agents": list(agent_manager.AGENTS.keys()),
         "available_models": list(agent_manager.ENDPOINTS.keys()),
@@ -397,4 +404,4 @@ async def get_agent_stats():
             "Professional audit reports",
             "Threat scoring"
         ]
-    }
+    })
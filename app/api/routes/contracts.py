@@ -4,7 +4,7 @@ Contract Analysis API Routes
 Endpoints for analyzing smart contracts deployed on Aptos.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Response
 from datetime import datetime
 import os
 from pathlib import Path
@@ -887,11 +887,12 @@ async def upload_and_analyze_contract(
 @router.get("/uploads/recent")
 async def get_recent_uploads(limit: int = 20):
     """Get recently uploaded contracts from MongoDB."""
-    from app.core.database import get_recent_uploads
+    from app.core.database import get_recent_uploads_json
     
     try:
-        uploads = await get_recent_uploads(limit=limit)
-        return {"uploads": uploads}
+        # Already serialized, so bypass FastAPI's JSON encoding
+        body = await get_recent_uploads_json(limit=limit)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch uploads: {str(e)}")
 
@@ -16,6 +16,7 @@ from app.models.schemas import (
     SeverityEnum,
     RiskLevelEnum
 )
+from app.api.responses import OrjsonResponse
 
 
 router = APIRouter(prefix="/demo", tags=["Demo"])
@@ -248,9 +249,10 @@ async def analyze_demo_contract(contract_name: str, include_source: bool = True)
     contract_data = DEMO_CONTRACTS[contract_name]
     vulns = contract_data["vulnerabilities"]
     
-    # Build vulnerability report
+    # Build vulnerability report. The demo data is a trusted literal, so
+    # skip Pydantic validation with model_construct.
     vuln_responses = [
-        VulnerabilityResponse(
+        VulnerabilityResponse.model_construct(
             type=v["type"],
             severity=SeverityEnum(v["severity"]),
             title=v["title"],
@@ -267,7 +269,7 @@ async def analyze_demo_contract(contract_name: str, include_source: bool = True)
     medium_count = sum(1 for v in vulns if v["severity"] == "medium")
     low_count = sum(1 for v in vulns if v["severity"] == "low")
     
-    vuln_report = VulnerabilityReportResponse(
+    vuln_report = VulnerabilityReportResponse.model_construct(
         module_address="demo",
         module_name=contract_name,
         vulnerabilities=vuln_responses,
@@ -302,7 +304,7 @@ async def analyze_demo_contract(contract_name: str, include_source: bool = True)
     ]
     factors_list = [f for f in factors_list if f is not None]
     
-    risk_score = RiskScoreResponse(
+    risk_score = RiskScoreResponse.model_construct(
         score=score,
         level=level,
         breakdown={
@@ -333,7 +335,7 @@ async def analyze_demo_contract(contract_name: str, include_source: bool = True)
         except FileNotFoundError:
             pass
     
-    return DemoAnalysisResponse(
+    return DemoAnalysisResponse.model_construct(
         contract_name=contract_name,
         address="demo",
         description=contract_data["description"],
@@ -353,6 +355,6 @@ async def get_demo_contract_source(contract_name: str):
     
     try:
         with open(source_path, 'r') as f:
-            return {"contract_name": contract_name, "source_code": f.read()}
+            return OrjsonResponse({"contract_name": contract_name, "source_code": f.read()})
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Source file not found for {contract_name}")
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, HTTPException, Query
 import httpx
+import orjson
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/prices", tags=["prices"])
@@ -81,7 +82,7 @@ async def fetch_with_retry(url: str, params: dict = None, retries: int = 3) -> d
             try:
                 response = await client.get(url, params=params, timeout=10.0)
                 if response.status_code == 200:
-                    return response.json()
+                    return orjson.loads(response.content)
                 elif response.status_code == 429:
                     # Rate limited, wait and retry
                     await asyncio.sleep(2 ** attempt)
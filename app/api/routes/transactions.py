@@ -4,7 +4,10 @@ Transaction API Routes
 Endpoints for analyzing and monitoring transactions.
 """
 
+import asyncio
+import time
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 
 from app.models.schemas import (
@@ -29,8 +32,13 @@ from app.ai.risk_scorer import get_risk_scorer
 from app.config import get_settings
 
 
+# No custom response class: the data routes declare a response_model, which
+# FastAPI serializes straight to JSON through Pydantic
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+# Monitor singleton resolved once for the /monitor endpoints
+_monitor = get_transaction_monitor()
+
 
 @router.get("/{address}", response_model=list[TransactionResponse])
 async def get_account_transactions(address: str, limit: int = 25):
@@ -40,8 +48,9 @@ async def get_account_transactions(address: str, limit: int = 25):
     try:
         transactions = await client.get_account_transactions(address, limit=limit)
         
+        # Upstream data has a known shape, so skip Pydantic validation
         return [
-            TransactionResponse(
+            TransactionResponse.model_construct(
                 hash=tx.get("hash", ""),
                 version=int(tx.get("version", 0)),
                 sender=tx.get("sender", ""),
@@ -74,6 +83,10 @@ async def analyze_transaction(request: TransactionAnalyzeRequest):
     try:
         # Fetch transaction
         tx_data = await client.get_transaction_by_hash(request.hash)
+        # Keep the chain's exact microseconds rather than round-tripping a float
+        timestamp_us = _parse_timestamp_us(tx_data.get("timestamp"))
+        if timestamp_us is None:
+            timestamp_us = time.time_ns() // 1000
         
         # Parse transaction
         tx_event = TransactionEvent(
@@ -81,7 +94,7 @@ async def analyze_transaction(request: TransactionAnalyzeRequest):
             version=int(tx_data.get("version", 0)),
             sender=tx_data.get("sender", ""),
             type=tx_data.get("type", "unknown"),
-            timestamp=_parse_timestamp(tx_data.get("timestamp")) or datetime.now(),
+            timestamp_us=timestamp_us,
             success=tx_data.get("success", False),
             gas_used=int(tx_data.get("gas_used", 0)),
             payload=tx_data.get("payload", {}),
@@ -89,62 +102,75 @@ async def analyze_transaction(request: TransactionAnalyzeRequest):
             raw=tx_data
         )
         
-        # Run compliance check
-        compliance_result = policy_engine.check_transaction(
-            sender=tx_event.sender,
-            gas_used=tx_event.gas_used,
-            payload=tx_event.payload
-        )
+        # Start AI anomaly detection first so the Groq round-trip overlaps
+        # the compliance check below
+        anomaly_task = None
+        if request.include_ai_analysis and settings.groq_api_key:
+            anomaly_task = asyncio.create_task(_detect_anomalies(tx_event))
         
-        compliance_response = ComplianceResultResponse(
-            passed=compliance_result.passed,
-            violations=[
-                PolicyViolationResponse(
-                    policy_name=v.policy_name,
-                    policy_type=v.policy_type.value,
-                    severity=SeverityEnum(v.severity.value),
-                    message=v.message,
-                    details=v.details
-                )
-                for v in compliance_result.violations
-            ],
-            policies_checked=compliance_result.policies_checked
-        )
+        try:
+            # Run compliance check off the event loop
+            compliance_result = await run_in_threadpool(
+                policy_engine.check_transaction,
+                sender=tx_event.sender,
+                gas_used=tx_event.gas_used,
+                payload=tx_event.payload
+            )
+            
+            compliance_response = ComplianceResultResponse(
+                passed=compliance_result.passed,
+                violations=[
+                    PolicyViolationResponse.model_construct(
+                        policy_name=v.policy_name,
+                        policy_type=v.policy_type.value,
+                        severity=SeverityEnum(v.severity.value),
+                        message=v.message,
+                        details=v.details
+                    )
+                    for v in compliance_result.violations
+                ],
+                policies_checked=compliance_result.policies_checked
+            )
+            
+            anomaly_report = await anomaly_task if anomaly_task is not None else None
+        finally:
+            # Do not leave the Groq call running unobserved if the
+            # compliance check failed before it was awaited
+            if anomaly_task is not None and not anomaly_task.done():
+                anomaly_task.cancel()
         
-        # Run anomaly detection
+        # Build the anomaly report, falling back to the simple detector
         anomaly_response = None
-        anomaly_report = None
         
-        if request.include_ai_analysis and settings.groq_api_key:
-            try:
-                anomaly_detector = get_anomaly_detector()
-                anomaly_report = await anomaly_detector.analyze_transaction(tx_event)
-                
-                anomaly_response = AnomalyReportResponse(
-                    analysis_type=anomaly_report.analysis_type,
-                    target=anomaly_report.target,
-                    findings=[
-                        AnomalyFindingResponse(
-                            category=f.category,
-                            severity=f.severity,
-                            title=f.title,
-                            description=f.description,
-                            confidence=f.confidence,
-                            evidence=f.evidence,
-                            recommendations=f.recommendations
-                        )
-                        for f in anomaly_report.findings
-                    ],
-                    summary=anomaly_report.summary,
-                    risk_assessment=anomaly_report.risk_assessment
-                )
-            except Exception as e:
-                # Fallback to simple detector
-                simple_detector = get_simple_anomaly_detector()
-                anomaly_report = simple_detector.analyze_transaction(tx_event)
+        if anomaly_report is not None:
+            anomaly_response = AnomalyReportResponse(
+                analysis_type=anomaly_report.analysis_type,
+                target=anomaly_report.target,
+                findings=[
+                    AnomalyFindingResponse.model_construct(
+                        category=f.category,
+                        severity=f.severity,
+                        title=f.title,
+                        description=f.description,
+                        confidence=f.confidence,
+                        evidence=f.evidence,
+                        recommendations=f.recommendations
+                    )
+                    for f in anomaly_report.findings
+                ],
+                summary=anomaly_report.summary,
+                risk_assessment=anomaly_report.risk_assessment
+            )
+        elif anomaly_task is not None:
+            # Fallback to simple detector
+            simple_detector = get_simple_anomaly_detector()
+            anomaly_report = await run_in_threadpool(
+                simple_detector.analyze_transaction, tx_event
+            )
         
         # Calculate risk score
-        risk_score = risk_scorer.calculate_risk_score(
+        risk_score = await run_in_threadpool(
+            risk_scorer.calculate_risk_score,
             compliance_result=compliance_result,
             anomaly_report=anomaly_report
         )
@@ -183,71 +209,88 @@ async def analyze_transaction(request: TransactionAnalyzeRequest):
 @router.get("/monitor/status", response_model=MonitorStatusResponse)
 async def get_monitor_status():
     """Get the current status of the transaction monitor."""
-    monitor = get_transaction_monitor()
-    
     return MonitorStatusResponse(
-        is_running=monitor.is_running,
-        monitored_addresses=list(monitor._monitored_addresses),
-        recent_transaction_count=len(monitor.recent_transactions),
-        last_version=monitor._last_version
+        is_running=_monitor.is_running,
+        monitored_addresses=_monitor.snapshot_addresses(),
+        recent_transaction_count=len(_monitor.recent_transactions_view),
+        last_version=_monitor._last_version
     )
 
 
 @router.post("/monitor/start")
 async def start_monitor():
     """Start the transaction monitor."""
-    monitor = get_transaction_monitor()
-    
-    if monitor.is_running:
+    if _monitor.is_running:
         return {"status": "already_running"}
     
-    await monitor.start()
+    await _monitor.start()
     return {"status": "started"}
 
 
 @router.post("/monitor/stop")
 async def stop_monitor():
     """Stop the transaction monitor."""
-    monitor = get_transaction_monitor()
-    
-    if not monitor.is_running:
+    if not _monitor.is_running:
         return {"status": "not_running"}
     
-    await monitor.stop()
+    await _monitor.stop()
     return {"status": "stopped"}
 
 
 @router.post("/monitor/address")
 async def add_monitored_address(request: MonitorAddressRequest):
     """Add an address to the monitoring list."""
-    monitor = get_transaction_monitor()
-    monitor.add_monitored_address(request.address)
+    _monitor.add_monitored_address(request.address)
     
     return {
         "status": "added",
         "address": request.address,
-        "total_monitored": len(monitor._monitored_addresses)
+        "total_monitored": len(_monitor._monitored_addresses)
     }
 
 
 @router.delete("/monitor/address/{address}")
 async def remove_monitored_address(address: str):
     """Remove an address from the monitoring list."""
-    monitor = get_transaction_monitor()
-    monitor.remove_monitored_address(address)
+    _monitor.remove_monitored_address(address)
     
     return {
         "status": "removed",
         "address": address,
-        "total_monitored": len(monitor._monitored_addresses)
+        "total_monitored": len(_monitor._monitored_addresses)
     }
 
 
+async def _detect_anomalies(tx_event: TransactionEvent):
+    """Run AI anomaly detection, returning None if it fails."""
+    try:
+        return await get_anomaly_detector().analyze_transaction(tx_event)
+    except Exception:
+        return None
+
+
+_fromtimestamp = datetime.fromtimestamp
+
+
 def _parse_timestamp(timestamp_str) -> datetime | None:
     """Parse Aptos timestamp to datetime."""
+    timestamp_us = _parse_timestamp_us(timestamp_str)
+    if timestamp_us is None:
+        return None
+    return _fromtimestamp(timestamp_us / 1_000_000)
+
+
+def _parse_timestamp_us(timestamp_str) -> int | None:
+    """Parse Aptos timestamp to integer microseconds."""
     if not timestamp_str:
         return None
+    # Aptos returns microseconds as a digit string; check that first so
+    # well-formed input never pays for exception handling
+    if isinstance(timestamp_str, str) and timestamp_str.isdecimal():
+        return int(timestamp_str)
+    if isinstance(timestamp_str, int):
+        return timestamp_str
     try:
-        return datetime.fromtimestamp(int(timestamp_str) / 1_000_000)
+        return int(timestamp_str)
     except (ValueError, TypeError):
         return None
@@ -12,6 +12,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 from app.core.ondemand_workflows import workflow_manager
+from app.api.responses import OrjsonResponse
 
 router = APIRouter(prefix="/api/workflows", tags=["workflows"])
 
@@ -30,12 +31,12 @@ async def list_workflows():
     triggered via HTTP, webhooks, cron jobs, or email.
     """
     workflows = workflow_manager.get_all_workflows()
-    return {
+    return OrjsonResponse({
         "success": True,
         "workflows": workflows,
         "total": len(workflows),
         "info": "These workflows are built in On-Demand.io platform and triggered via HTTP"
-    }
+    })
 
 
 @router.get("/{workflow_key}")
@@ -44,10 +45,10 @@ async def get_workflow(workflow_key: str):
     workflow = workflow_manager.get_workflow(workflow_key)
     if not workflow:
         raise HTTPException(status_code=404, detail=f"Workflow '{workflow_key}' not found")
-    return {
+    return OrjsonResponse({
         "success": True,
         "workflow": workflow
-    }
+    })
 
 
 @router.post("/activate")
@@ -61,10 +62,10 @@ async def activate_workflow(request: WorkflowActivateRequest):
     """
     try:
         result = await workflow_manager.activate_workflow(workflow_id=request.workflow_id)
-        return {
+        return OrjsonResponse({
             "success": result.get("success", False),
             **result
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Workflow activation failed: {str(e)}")
 
@@ -81,10 +82,10 @@ async def execute_workflow(request: WorkflowActivateRequest):
     """
     try:
         result = await workflow_manager.trigger_workflow(workflow_id=request.workflow_id)
-        return {
+        return OrjsonResponse({
             "success": result.get("success", False),
             **result
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Workflow execution failed: {str(e)}")
 
@@ -107,7 +108,7 @@ async def execute_solana_trading_bot():
     try:
         workflow = workflow_manager.get_workflow("solana_trading_bot")
         result = await workflow_manager.trigger_workflow(workflow["id"])
-        return {"success": result.get("success", False), **result}
+        return OrjsonResponse({"success": result.get("success", False), **result})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Trading bot execution failed: {str(e)}")
 
@@ -115,10 +116,10 @@ async def execute_solana_trading_bot():
 @router.get("/health")
 async def workflows_health():
     """Check workflow system health."""
-    return {
+    return OrjsonResponse({
         "status": "healthy",
         "workflows_available": len(workflow_manager.get_all_workflows()),
         "api_connected": True,
         "execution_method": "HTTP POST to /workflow/{id}/execute"
-    }
+    })
 
@@ -0,0 +1,100 @@
+"""
+Static Frontend Files
+
+StaticFiles variant that serves the small files of the exported frontend
+from memory, falling back to disk for everything else.
+"""
+
+import hashlib
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Static files with an in-memory cache of small assets.
+    
+    Files up to MAX_CACHED_SIZE are read once at construction and served
+    without touching the filesystem, with the same ETag and Last-Modified
+    validators StaticFiles would send. Larger files, misses, redirects and
+    404 handling go through the regular StaticFiles lookup.
+    """
+    
+    # Largest file kept in memory, in bytes
+    MAX_CACHED_SIZE = 64 * 1024
+    
+    # Content-hashed build output never changes under the same URL; every
+    # other file (HTML in particular) must be revalidated after a deploy
+    IMMUTABLE_PREFIXES = ("_next/static/",)
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    DEFAULT_CACHE_CONTROL = "no-cache"
+    
+    def __init__(self, *, directory: str, **kwargs):
+        """Initialize the mount and load small files into memory."""
+        super().__init__(directory=directory, **kwargs)
+        self._cache = self._load_cache(Path(directory))
+    
+    def _load_cache(self, root: Path) -> dict[str, tuple[bytes, str, dict[str, str]]]:
+        """Read every small file under root, keyed like StaticFiles paths."""
+        cache: dict[str, tuple[bytes, str, dict[str, str]]] = {}
+        
+        for file_path in root.rglob("*"):
+            if not file_path.is_file():
+                continue
+            stat_result = file_path.stat()
+            if stat_result.st_size > self.MAX_CACHED_SIZE:
+                continue
+            
+            key = os.path.normpath(file_path.relative_to(root))
+            media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+            
+            # Validators match the ones FileResponse computes from stat
+            etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+            headers = {
+                "etag": f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"',
+                "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+                "cache-control": self._cache_control(key)
+            }
+            entry = (file_path.read_bytes(), media_type, headers)
+            cache[key] = entry
+            
+            # Directory URLs resolve to their index.html in HTML mode
+            if self.html and file_path.name == "index.html":
+                cache[os.path.normpath(file_path.parent.relative_to(root))] = entry
+        
+        return cache
+    
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """Serve a cached file if possible, otherwise look it up on disk."""
+        entry = self._cache.get(path)
+        # Directory URLs without a trailing slash still get redirected
+        if (
+            entry is not None
+            and scope["method"] in ("GET", "HEAD")
+            and (scope["path"].endswith("/") or not self._is_directory_key(path))
+        ):
+            content, media_type, headers = entry
+            if self.is_not_modified(Headers(headers), Headers(scope=scope)):
+                return NotModifiedResponse(Headers(headers))
+            return Response(content=content, media_type=media_type, headers=headers)
+        
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["cache-control"] = self._cache_control(path)
+        return response
+    
+    def _cache_control(self, path: str) -> str:
+        """Get the Cache-Control policy for a file path."""
+        if path.replace(os.sep, "/").startswith(self.IMMUTABLE_PREFIXES):
+            return self.IMMUTABLE_CACHE_CONTROL
+        return self.DEFAULT_CACHE_CONTROL
+    
+    def _is_directory_key(self, path: str) -> bool:
+        """Check whether a cache key is a directory index alias."""
+        return os.path.join(path, "index.html") in self._cache
@@ -6,9 +6,11 @@ Real-time WebSocket endpoint for streaming alerts and updates.
 
 import asyncio
 import json
+import orjson
 from datetime import datetime
 from typing import Any
 from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.transaction_monitor import get_transaction_monitor, TransactionEvent
 from app.ai.policy_engine import get_policy_engine
@@ -19,31 +21,33 @@ class ConnectionManager:
     """Manages WebSocket connections."""
     
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: set[WebSocket] = set()
     
     async def connect(self, websocket: WebSocket):
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
     
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
     
     async def broadcast(self, message: dict[str, Any]):
         """Broadcast a message to all connected clients."""
-        disconnected = []
+        # Serialize once and send to every client concurrently. Frames stay
+        # text so clients can keep using JSON.parse on the payload.
+        payload = orjson.dumps(message).decode()
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_text(payload) for connection in connections),
+            return_exceptions=True
+        )
         
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
+        # Clean up disconnected clients in one pass
+        self.active_connections.difference_update(
+            conn for conn, result in zip(connections, results)
+            if isinstance(result, Exception)
+        )
     
     async def send_personal(self, websocket: WebSocket, message: dict[str, Any]):
         """Send a message to a specific client."""
@@ -56,56 +60,62 @@ class ConnectionManager:
 # Global connection manager
 manager = ConnectionManager()
 
+# Singletons resolved once at import for the per-event hot path
+_policy_engine = get_policy_engine()
+_risk_scorer = get_risk_scorer()
+_monitor = get_transaction_monitor()
+
 
 async def handle_transaction_event(event: TransactionEvent):
     """Handle a new transaction event and broadcast alerts."""
-    policy_engine = get_policy_engine()
-    risk_scorer = get_risk_scorer()
-    
-    # Check compliance
-    compliance_result = policy_engine.check_transaction(
+    # Check compliance and score risk off the event loop so broadcasts and
+    # pings keep flowing while policies are evaluated
+    compliance_result = await run_in_threadpool(
+        _policy_engine.check_transaction,
         sender=event.sender,
         gas_used=event.gas_used,
         payload=event.payload
     )
     
     # Calculate quick risk score
-    risk_score = risk_scorer.calculate_risk_score(compliance_result=compliance_result)
-    
-    # Create alert message
-    alert = {
-        "type": "transaction_alert",
-        "timestamp": datetime.now().isoformat(),
-        "transaction_hash": event.hash,
-        "sender": event.sender,
-        "risk_level": risk_score.level.value,
-        "risk_score": risk_score.score,
-        "success": event.success,
-        "gas_used": event.gas_used,
-        "violations": [
-            {
-                "policy": v.policy_name,
-                "severity": v.severity.value,
-                "message": v.message
-            }
-            for v in compliance_result.violations
-        ]
-    }
-    
-    # Broadcast if there are violations or high risk
-    if not compliance_result.passed or risk_score.score >= 30:
-        await manager.broadcast(alert)
+    risk_score = await run_in_threadpool(
+        _risk_scorer.calculate_risk_score,
+        compliance_result=compliance_result
+    )
     
-    # Also broadcast new transaction notification
-    tx_notification = {
+    # Build a single notification per event; an alert is attached only
+    # when there are violations or the risk is elevated
+    timestamp = datetime.now().isoformat()
+    message = {
         "type": "new_transaction",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": timestamp,
         "transaction_hash": event.hash,
         "sender": event.sender,
         "success": event.success,
         "gas_used": event.gas_used
     }
-    await manager.broadcast(tx_notification)
+    
+    if not compliance_result.passed or risk_score.score >= 30:
+        message["alert"] = {
+            "type": "transaction_alert",
+            "timestamp": timestamp,
+            "transaction_hash": event.hash,
+            "sender": event.sender,
+            "risk_level": risk_score.level.value,
+            "risk_score": risk_score.score,
+            "success": event.success,
+            "gas_used": event.gas_used,
+            "violations": [
+                {
+                    "policy": v.policy_name,
+                    "severity": v.severity.value,
+                    "message": v.message
+                }
+                for v in compliance_result.violations
+            ]
+        }
+    
+    await manager.broadcast(message)
 
 
 async def websocket_endpoint(websocket: WebSocket):
@@ -119,10 +129,6 @@ async def websocket_endpoint(websocket: WebSocket):
     """
     await manager.connect(websocket)
     
-    # Register transaction callback
-    monitor = get_transaction_monitor()
-    monitor.add_async_callback(handle_transaction_event)
-    
     # Send welcome message
     await websocket.send_json({
         "type": "connected",
@@ -171,8 +177,7 @@ async def handle_client_message(websocket: WebSocket, message: dict):
         # Subscribe to a specific address
         address = message.get("address", "")
         if address:
-            monitor = get_transaction_monitor()
-            monitor.add_monitored_address(address)
+            _monitor.add_monitored_address(address)
             await websocket.send_json({
                 "type": "subscribed",
                 "address": address
@@ -182,8 +187,7 @@ async def handle_client_message(websocket: WebSocket, message: dict):
         # Unsubscribe from an address
         address = message.get("address", "")
         if address:
-            monitor = get_transaction_monitor()
-            monitor.remove_monitored_address(address)
+            _monitor.remove_monitored_address(address)
             await websocket.send_json({
                 "type": "unsubscribed",
                 "address": address
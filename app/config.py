@@ -3,7 +3,7 @@ Configuration settings for the AI Compliance Agent.
 """
 
 import os
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -40,6 +40,14 @@ class Settings(BaseSettings):
         default="aptos_compliance",
         description="MongoDB database name"
     )
+    mongodb_pool_size: int = Field(
+        default=50,
+        description="Maximum MongoDB connection pool size"
+    )
+    mongodb_compressors: str = Field(
+        default="zlib",
+        description="MongoDB wire compressors (zstd needs the zstandard package)"
+    )
     
     # On-Demand.io AI Agents API
     ondemand_api_key: str = Field(
@@ -50,6 +58,18 @@ class Settings(BaseSettings):
         default="https://api.on-demand.io/chat/v1",
         description="On-Demand.io Chat API base URL"
     )
+    ondemand_max_concurrency: int = Field(
+        default=4,
+        description="Maximum concurrent agent queries per multi-agent analysis"
+    )
+    ondemand_agent_timeout: float = Field(
+        default=60.0,
+        description="Per-agent timeout in seconds for multi-agent analysis"
+    )
+    ondemand_prompt_mode: str = Field(
+        default="full",
+        description="Agent system prompt variant: full or compact"
+    )
     
     # Server
     host: str = Field(default="0.0.0.0")
@@ -74,6 +94,25 @@ class Settings(BaseSettings):
         description="Transaction polling interval in seconds"
     )
     max_transactions_per_query: int = Field(default=25)
+    monitor_mode: str = Field(
+        default="stream",
+        description="Transaction monitor mode: stream (continuous paging) or poll"
+    )
+    monitor_keep_raw: bool = Field(
+        default=False,
+        description="Keep the full API response on monitored transaction events"
+    )
+    
+    # Contract analysis
+    contract_cache_ttl: int = Field(
+        default=3600,
+        description="Seconds to cache parsed contract modules"
+    )
+    
+    @cached_property
+    def cors_origins_list(self) -> tuple[str, ...]:
+        """CORS origins split from the comma-separated setting, computed once."""
+        return tuple(origin.strip() for origin in self.cors_origins.split(","))
     
     class Config:
         env_file = ".env"
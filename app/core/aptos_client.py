@@ -5,8 +5,11 @@ Provides a simplified interface for interacting with the Aptos blockchain
 using the official Aptos Python SDK.
 """
 
+import asyncio
+import time
 import httpx
-from typing import Any, Optional
+import orjson
+from typing import Any, AsyncIterator, Optional
 from app.config import get_settings
 
 
@@ -18,8 +21,21 @@ class AptosClient:
     - Fetching account resources and modules
     - Retrieving transaction history
     - Getting module metadata and ABIs
+    
+    Account reads are cached for one monitor poll interval and committed
+    transactions are cached until evicted, since they never change.
     """
     
+    # Maximum number of cached responses before the oldest is evicted
+    CACHE_MAX_ENTRIES = 1024
+    
+    # Cap on in-flight requests to the node, kept below the pool size so
+    # bursts queue here instead of piling up inside httpx
+    MAX_CONCURRENT_REQUESTS = 64
+    
+    # Per-call timeout for reads so a stuck node cannot hold every slot
+    READ_TIMEOUT = 5.0
+    
     def __init__(self, node_url: Optional[str] = None):
         """
         Initialize the Aptos client.
@@ -32,8 +48,17 @@ class AptosClient:
         self._client = httpx.AsyncClient(
             base_url=self.node_url,
             timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0
+            ),
             headers={"Content-Type": "application/json"}
         )
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        self._cache_ttl = float(settings.monitor_poll_interval)
+        self._cache: dict[tuple[str, ...], tuple[Optional[float], Any]] = {}
     
     async def close(self):
         """Close the HTTP client."""
@@ -45,35 +70,57 @@ class AptosClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
     
-    async def get_account(self, address: str) -> dict[str, Any]:
+    async def get_account(
+        self,
+        address: str,
+        bypass_cache: bool = False
+    ) -> dict[str, Any]:
         """
         Get account information.
         
         Args:
             address: Account address (with or without 0x prefix)
+            bypass_cache: Skip the response cache and always hit the node
             
         Returns:
             Account data including sequence number and authentication key
         """
         address = self._normalize_address(address)
-        response = await self._client.get(f"/accounts/{address}")
-        response.raise_for_status()
-        return response.json()
+        key = ("account", address)
+        if not bypass_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+        
+        data = await self._get_json(f"/accounts/{address}")
+        self._cache_set(key, data, self._cache_ttl)
+        return data
     
-    async def get_account_resources(self, address: str) -> list[dict[str, Any]]:
+    async def get_account_resources(
+        self,
+        address: str,
+        bypass_cache: bool = False
+    ) -> list[dict[str, Any]]:
         """
         Get all resources for an account.
         
         Args:
             address: Account address
+            bypass_cache: Skip the response cache and always hit the node
             
         Returns:
             List of account resources
         """
         address = self._normalize_address(address)
-        response = await self._client.get(f"/accounts/{address}/resources")
-        response.raise_for_status()
-        return response.json()
+        key = ("resources", address)
+        if not bypass_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+        
+        data = await self._get_json(f"/accounts/{address}/resources")
+        self._cache_set(key, data, self._cache_ttl)
+        return data
     
     async def get_account_resource(
         self, 
@@ -91,11 +138,9 @@ class AptosClient:
             Resource data
         """
         address = self._normalize_address(address)
-        response = await self._client.get(
+        return await self._get_json(
             f"/accounts/{address}/resource/{resource_type}"
         )
-        response.raise_for_status()
-        return response.json()
     
     async def get_account_modules(self, address: str) -> list[dict[str, Any]]:
         """
@@ -108,9 +153,23 @@ class AptosClient:
             List of module metadata including bytecode and ABI
         """
         address = self._normalize_address(address)
-        response = await self._client.get(f"/accounts/{address}/modules")
-        response.raise_for_status()
-        return response.json()
+        return await self._get_json(f"/accounts/{address}/modules")
+    
+    async def get_account_modules_raw(self, address: str) -> bytes:
+        """
+        Get all modules deployed to an account as the undecoded JSON body.
+        
+        Lets callers validate the response straight from bytes instead
+        of building intermediate dicts.
+        
+        Args:
+            address: Account address
+            
+        Returns:
+            Raw JSON response body
+        """
+        address = self._normalize_address(address)
+        return await self._get_bytes(f"/accounts/{address}/modules")
     
     async def get_account_module(
         self, 
@@ -128,11 +187,9 @@ class AptosClient:
             Module metadata including bytecode and ABI
         """
         address = self._normalize_address(address)
-        response = await self._client.get(
+        return await self._get_json(
             f"/accounts/{address}/module/{module_name}"
         )
-        response.raise_for_status()
-        return response.json()
     
     async def get_account_transactions(
         self,
@@ -156,26 +213,37 @@ class AptosClient:
         if start is not None:
             params["start"] = start
         
-        response = await self._client.get(
+        return await self._get_json(
             f"/accounts/{address}/transactions",
             params=params
         )
-        response.raise_for_status()
-        return response.json()
     
-    async def get_transaction_by_hash(self, txn_hash: str) -> dict[str, Any]:
+    async def get_transaction_by_hash(
+        self,
+        txn_hash: str,
+        bypass_cache: bool = False
+    ) -> dict[str, Any]:
         """
         Get a transaction by its hash.
         
         Args:
             txn_hash: Transaction hash
+            bypass_cache: Skip the response cache and always hit the node
             
         Returns:
             Transaction data
         """
-        response = await self._client.get(f"/transactions/by_hash/{txn_hash}")
-        response.raise_for_status()
-        return response.json()
+        key = ("transaction", txn_hash.lower())
+        if not bypass_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+        
+        data = await self._get_json(f"/transactions/by_hash/{txn_hash}")
+        # Pending transactions can still change; only committed ones are final
+        if data.get("type") != "pending_transaction":
+            self._cache_set(key, data, None)
+        return data
     
     async def get_transactions(
         self,
@@ -196,9 +264,52 @@ class AptosClient:
         if start is not None:
             params["start"] = start
         
-        response = await self._client.get("/transactions", params=params)
-        response.raise_for_status()
-        return response.json()
+        return await self._get_json("/transactions", params=params)
+    
+    async def stream_transactions(
+        self,
+        start: int,
+        batch_size: int = 100,
+        idle_interval: float = 1.0
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Continuously yield pages of committed transactions from a version.
+        
+        The REST API has no push subscription, so this pages forward
+        through /transactions. Full pages are followed immediately so
+        bursts are caught up without waiting, and the node is only
+        re-queried after idle_interval once the ledger head is reached.
+        
+        Args:
+            start: First version to yield
+            batch_size: Transactions per request (the node caps this at 100)
+            idle_interval: Seconds to wait after a partial page
+            
+        Yields:
+            Non-empty pages of transactions in version order
+        """
+        next_version = start
+        
+        while True:
+            transactions = await self._get_transactions_from(next_version, batch_size)
+            if transactions:
+                yield transactions
+                next_version = int(transactions[-1]["version"]) + 1
+            if len(transactions) < batch_size:
+                await asyncio.sleep(idle_interval)
+    
+    async def _get_transactions_from(self, start: int, limit: int) -> list[dict[str, Any]]:
+        """Get transactions from a version, or none if it is past the ledger head."""
+        try:
+            return await self.get_transactions(limit=limit, start=start)
+        except httpx.HTTPStatusError as e:
+            # The node rejects a start above its ledger version with a 400
+            if e.response.status_code != 400:
+                raise
+            ledger_info = await self.get_ledger_info()
+            if start > int(ledger_info.get("ledger_version", 0)):
+                return []
+            raise
     
     async def get_ledger_info(self) -> dict[str, Any]:
         """
@@ -207,9 +318,7 @@ class AptosClient:
         Returns:
             Ledger info including chain ID, epoch, and block height
         """
-        response = await self._client.get("/")
-        response.raise_for_status()
-        return response.json()
+        return await self._get_json("/")
     
     async def simulate_transaction(
         self,
@@ -227,12 +336,55 @@ class AptosClient:
             Simulation results
         """
         # This requires constructing a proper transaction - simplified for now
-        response = await self._client.post(
-            "/transactions/simulate",
-            json=payload
-        )
+        async with self._semaphore:
+            response = await self._client.post(
+                "/transactions/simulate",
+                json=payload
+            )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
+    
+    async def _get_json(
+        self,
+        url: str,
+        params: Optional[dict[str, Any]] = None
+    ) -> Any:
+        """GET a URL from the node and decode the JSON body with orjson."""
+        return orjson.loads(await self._get_bytes(url, params))
+    
+    async def _get_bytes(
+        self,
+        url: str,
+        params: Optional[dict[str, Any]] = None
+    ) -> bytes:
+        """GET a URL from the node and return the raw response body."""
+        async with self._semaphore:
+            response = await self._client.get(
+                url,
+                params=params,
+                timeout=self.READ_TIMEOUT
+            )
+        response.raise_for_status()
+        return response.content
+    
+    def _cache_get(self, key: tuple[str, ...]) -> Optional[Any]:
+        """Return a cached response if present and not expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        return value
+    
+    def _cache_set(self, key: tuple[str, ...], value: Any, ttl: Optional[float]):
+        """Cache a response; a ttl of None never expires."""
+        if key not in self._cache and len(self._cache) >= self.CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            del self._cache[next(iter(self._cache))]
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._cache[key] = (expires_at, value)
     
     def _normalize_address(self, address: str) -> str:
         """Normalize address format."""
@@ -5,10 +5,18 @@ Fetches and parses Move module metadata from the Aptos blockchain.
 Extracts function signatures, entry points, and module structure for analysis.
 """
 
+import asyncio
+import re
+import time
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from functools import cache
+from typing import Any, Optional, TypedDict
 from enum import Enum
 
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from app.config import get_settings
 from app.core.aptos_client import get_aptos_client
 
 
@@ -20,7 +28,14 @@ class FunctionVisibility(str, Enum):
     ENTRY = "entry"
 
 
-@dataclass
+# Plain dict lookup avoids the slow Enum __call__ path per ABI function
+_VIS_MAP = {v.value: v for v in FunctionVisibility}
+
+# Case-insensitive signer match without allocating lowercased param copies
+_SIGNER_RE = re.compile(r"signer", re.IGNORECASE)
+
+
+@dataclass(slots=True)
 class FunctionSignature:
     """Represents a Move function signature."""
     name: str
@@ -29,9 +44,10 @@ class FunctionSignature:
     generic_type_params: list[dict[str, Any]] = field(default_factory=list)
     params: list[str] = field(default_factory=list)
     return_types: list[str] = field(default_factory=list)
+    has_signer: bool = False  # Precomputed at parse time from params
 
 
-@dataclass
+@dataclass(slots=True)
 class StructDefinition:
     """Represents a Move struct definition."""
     name: str
@@ -41,16 +57,76 @@ class StructDefinition:
     fields: list[dict[str, str]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModuleInfo:
-    """Parsed information about a Move module."""
+    """Parsed information about a Move module (immutable once parsed)."""
     address: str
     name: str
-    friends: list[str] = field(default_factory=list)
-    functions: list[FunctionSignature] = field(default_factory=list)
-    structs: list[StructDefinition] = field(default_factory=list)
-    exposed_functions: list[str] = field(default_factory=list)
+    friends: tuple[str, ...] = ()
+    functions: tuple[FunctionSignature, ...] = ()
+    structs: tuple[StructDefinition, ...] = ()
+    exposed_functions: tuple[str, ...] = ()
+    bytecode: Optional[str] = None
+    
+    def __hash__(self) -> int:
+        # Identity of a module is its address and name
+        return hash((self.address, self.name))
+
+
+class AccessPatternAnalysis(TypedDict):
+    """Result of ContractParser.analyze_access_patterns."""
+    total_functions: int
+    entry_functions: int
+    public_functions: int
+    friend_functions: int
+    has_signer_params: list[str]
+    potential_issues: list[dict[str, str]]
+
+
+class AbiFunction(BaseModel):
+    """Function entry of a Move module ABI as returned by the Aptos API."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
+    name: str = ""
+    visibility: str = "private"
+    is_entry: bool = False
+    generic_type_params: list[dict[str, Any]] = []
+    params: list[str] = []
+    return_types: list[str] = Field(default=[], alias="return")
+
+
+class AbiStruct(BaseModel):
+    """Struct entry of a Move module ABI as returned by the Aptos API."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
+    name: str = ""
+    is_native: bool = False
+    abilities: list[str] = []
+    generic_type_params: list[dict[str, Any]] = []
+    fields: list[dict[str, str]] = []
+
+
+class AbiModule(BaseModel):
+    """Move module ABI as returned by the Aptos API."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
+    name: str = "unknown"
+    friends: list[str] = []
+    exposed_functions: list[AbiFunction] = []
+    structs: list[AbiStruct] = []
+
+
+class AbiModuleData(BaseModel):
+    """Module entry (bytecode plus ABI) as returned by the Aptos API."""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+    
     bytecode: Optional[str] = None
+    abi: AbiModule = AbiModule()
+
+
+# Built once so ABI validation runs entirely in pydantic-core
+_MODULE_ADAPTER = TypeAdapter(AbiModuleData)
+_MODULES_ADAPTER = TypeAdapter(list[AbiModuleData])
 
 
 class ContractParser:
@@ -59,8 +135,20 @@ class ContractParser:
     
     Extracts module structure, function signatures, and metadata
     from deployed contracts for security analysis.
+    
+    Parsed modules are cached for a configurable TTL, and concurrent
+    requests for the same module share a single fetch.
     """
     
+    # Maximum number of cached results before the oldest is evicted
+    CACHE_MAX_ENTRIES = 1024
+    
+    def __init__(self):
+        """Initialize the parser and its module cache."""
+        self._cache_ttl = get_settings().contract_cache_ttl
+        self._cache: dict[tuple[str, ...], tuple[float, Any]] = {}
+        self._inflight: dict[tuple[str, ...], asyncio.Task] = {}
+    
     async def get_module_info(
         self,
         address: str,
@@ -76,9 +164,15 @@ class ContractParser:
         Returns:
             Parsed module information
         """
-        client = await get_aptos_client()
-        module_data = await client.get_account_module(address, module_name)
-        return self._parse_module(address, module_data)
+        async def fetch() -> ModuleInfo:
+            client = await get_aptos_client()
+            module_data = await client.get_account_module(address, module_name)
+            return self._parse_module(
+                address, _MODULE_ADAPTER.validate_python(module_data)
+            )
+        
+        key = ("module", self._cache_address(address), module_name)
+        return await self._get_cached(key, fetch)
     
     async def get_all_modules(self, address: str) -> list[ModuleInfo]:
         """
@@ -90,9 +184,90 @@ class ContractParser:
         Returns:
             List of parsed module information
         """
-        client = await get_aptos_client()
-        modules_data = await client.get_account_modules(address)
-        return [self._parse_module(address, m) for m in modules_data]
+        async def fetch() -> list[ModuleInfo]:
+            client = await get_aptos_client()
+            # Validate straight from the response bytes, skipping the dicts
+            raw = await client.get_account_modules_raw(address)
+            modules_data = _MODULES_ADAPTER.validate_json(raw)
+            return [self._parse_module(address, m) for m in modules_data]
+        
+        key = ("modules", self._cache_address(address))
+        return list(await self._get_cached(key, fetch))
+    
+    def invalidate(self, address: str, module_name: Optional[str] = None):
+        """
+        Drop cached modules for an address, e.g. after a redeployment.
+        
+        Args:
+            address: Account address
+            module_name: Only drop this module; drops all when omitted
+        """
+        address = self._cache_address(address)
+        for key in list(self._cache):
+            if key[1] != address:
+                continue
+            if module_name is None or key[0] == "modules" or key[2] == module_name:
+                del self._cache[key]
+    
+    async def _get_cached(self, key: tuple[str, ...], fetch) -> Any:
+        """Return a cached value, or fetch it once for all concurrent callers."""
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._store_result(key, t))
+        
+        # Shield so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+    
+    def _store_result(self, key: tuple[str, ...], task: asyncio.Task):
+        """Cache the result of a finished fetch; failures are not cached."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if key not in self._cache and len(self._cache) >= self.CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = (time.monotonic() + self._cache_ttl, task.result())
+    
+    def _cache_address(self, address: str) -> str:
+        """Normalize an address for use in cache keys."""
+        address = address.lower()
+        if not address.startswith("0x"):
+            address = f"0x{address}"
+        return address
+    
+    async def get_all_modules_bulk(
+        self,
+        addresses: list[str],
+        batch_size: int = 16
+    ) -> list[list[ModuleInfo]]:
+        """
+        Get information about all modules deployed to several addresses.
+        
+        Up to batch_size addresses are fetched concurrently, so the
+        wall-clock cost is roughly one round-trip per batch instead of one
+        per address. Each address goes through the module cache, so cached
+        addresses are not fetched again and repeats share one fetch.
+        
+        Args:
+            addresses: Account addresses
+            batch_size: Maximum number of concurrent requests
+            
+        Returns:
+            Parsed module information per address, in input order
+        """
+        semaphore = asyncio.Semaphore(batch_size)
+        
+        async def fetch(address: str) -> list[ModuleInfo]:
+            async with semaphore:
+                return await self.get_all_modules(address)
+        
+        return list(await asyncio.gather(*(fetch(address) for address in addresses)))
     
     async def get_module_names(self, address: str) -> list[str]:
         """
@@ -104,126 +279,113 @@ class ContractParser:
         Returns:
             List of module names
         """
+        # Reuse parsed modules if get_all_modules already cached them
+        entry = self._cache.get(("modules", self._cache_address(address)))
+        if entry is not None and entry[0] > time.monotonic():
+            return [m.name for m in entry[1]]
+        
         client = await get_aptos_client()
         modules_data = await client.get_account_modules(address)
-        return [self._extract_module_name(m) for m in modules_data]
+        return [(m.get("abi") or {}).get("name", "unknown") for m in modules_data]
     
-    def _parse_module(self, address: str, module_data: dict) -> ModuleInfo:
-        """Parse raw module data into ModuleInfo."""
-        abi = module_data.get("abi", {})
-        
-        module_name = abi.get("name", "unknown")
+    def _parse_module(self, address: str, module_data: AbiModuleData) -> ModuleInfo:
+        """Parse validated module data into ModuleInfo."""
+        abi = module_data.abi
         
         # Parse functions
-        functions = []
-        exposed_functions = []
-        for func in abi.get("exposed_functions", []):
-            func_sig = self._parse_function(func)
-            functions.append(func_sig)
-            if func_sig.is_entry or func_sig.visibility == FunctionVisibility.PUBLIC:
-                exposed_functions.append(func_sig.name)
+        functions = tuple([self._parse_function(f) for f in abi.exposed_functions])
+        exposed_functions = tuple([
+            f.name for f in functions
+            if f.is_entry or f.visibility == FunctionVisibility.PUBLIC
+        ])
         
         # Parse structs
-        structs = []
-        for struct in abi.get("structs", []):
-            structs.append(self._parse_struct(struct))
-        
-        # Get friends
-        friends = abi.get("friends", [])
+        structs = tuple([self._parse_struct(s) for s in abi.structs])
         
         return ModuleInfo(
             address=address,
-            name=module_name,
-            friends=friends,
+            name=abi.name,
+            friends=tuple(abi.friends),
             functions=functions,
             structs=structs,
             exposed_functions=exposed_functions,
-            bytecode=module_data.get("bytecode")
+            bytecode=module_data.bytecode
         )
     
-    def _parse_function(self, func_data: dict) -> FunctionSignature:
-        """Parse a function from ABI data."""
-        visibility_str = func_data.get("visibility", "private")
-        visibility = FunctionVisibility(visibility_str)
+    def _parse_function(self, func: AbiFunction) -> FunctionSignature:
+        """Parse a function from validated ABI data."""
+        visibility = _VIS_MAP.get(func.visibility, FunctionVisibility.PRIVATE)
+        
+        # Signer detection is done once here so analyzers never rescan params
+        has_signer = any(_SIGNER_RE.search(param) for param in func.params)
         
         return FunctionSignature(
-            name=func_data.get("name", ""),
+            name=func.name,
             visibility=visibility,
-            is_entry=func_data.get("is_entry", False),
-            generic_type_params=func_data.get("generic_type_params", []),
-            params=func_data.get("params", []),
-            return_types=func_data.get("return", [])
+            is_entry=func.is_entry,
+            generic_type_params=func.generic_type_params,
+            params=func.params,
+            return_types=func.return_types,
+            has_signer=has_signer
         )
     
-    def _parse_struct(self, struct_data: dict) -> StructDefinition:
-        """Parse a struct from ABI data."""
+    def _parse_struct(self, struct: AbiStruct) -> StructDefinition:
+        """Parse a struct from validated ABI data."""
         return StructDefinition(
-            name=struct_data.get("name", ""),
-            is_native=struct_data.get("is_native", False),
-            abilities=struct_data.get("abilities", []),
-            generic_type_params=struct_data.get("generic_type_params", []),
-            fields=struct_data.get("fields", [])
+            name=struct.name,
+            is_native=struct.is_native,
+            abilities=struct.abilities,
+            generic_type_params=struct.generic_type_params,
+            fields=struct.fields
         )
     
-    def _extract_module_name(self, module_data: dict) -> str:
-        """Extract module name from raw data."""
-        abi = module_data.get("abi", {})
-        return abi.get("name", "unknown")
-    
-    def analyze_access_patterns(self, module: ModuleInfo) -> dict[str, Any]:
+    def analyze_access_patterns(self, module: ModuleInfo) -> AccessPatternAnalysis:
         """
         Analyze access control patterns in a module.
         
         Returns:
             Analysis results including potential issues
         """
-        analysis = {
-            "total_functions": len(module.functions),
-            "entry_functions": 0,
-            "public_functions": 0,
-            "friend_functions": 0,
-            "has_signer_params": [],
-            "potential_issues": []
-        }
+        functions = module.functions
+        visibility_counts = Counter(f.visibility for f in functions)
         
-        for func in module.functions:
+        entry_functions = 0
+        has_signer_params = []
+        potential_issues = []
+        
+        for func in functions:
             if func.is_entry:
-                analysis["entry_functions"] += 1
-            if func.visibility == FunctionVisibility.PUBLIC:
-                analysis["public_functions"] += 1
-            if func.visibility == FunctionVisibility.FRIEND:
-                analysis["friend_functions"] += 1
+                entry_functions += 1
+                # Flag entry functions without signer (potential issue)
+                if not func.has_signer:
+                    potential_issues.append({
+                        "function": func.name,
+                        "issue": "Entry function without signer parameter",
+                        "severity": "medium"
+                    })
             
             # Check for signer parameters (access control)
-            has_signer = any("signer" in param.lower() for param in func.params)
-            if has_signer:
-                analysis["has_signer_params"].append(func.name)
-            
-            # Flag entry functions without signer (potential issue)
-            if func.is_entry and not has_signer:
-                analysis["potential_issues"].append({
-                    "function": func.name,
-                    "issue": "Entry function without signer parameter",
-                    "severity": "medium"
-                })
+            if func.has_signer:
+                has_signer_params.append(func.name)
         
         # Check for excessive friends
         if len(module.friends) > 5:
-            analysis["potential_issues"].append({
+            potential_issues.append({
                 "issue": f"Large number of friend modules ({len(module.friends)})",
                 "severity": "low"
             })
         
-        return analysis
-
-
-# Singleton instance
-_parser: Optional[ContractParser] = None
+        return {
+            "total_functions": len(functions),
+            "entry_functions": entry_functions,
+            "public_functions": visibility_counts[FunctionVisibility.PUBLIC],
+            "friend_functions": visibility_counts[FunctionVisibility.FRIEND],
+            "has_signer_params": has_signer_params,
+            "potential_issues": potential_issues
+        }
 
 
+@cache
 def get_contract_parser() -> ContractParser:
     """Get or create the contract parser instance."""
-    global _parser
-    if _parser is None:
-        _parser = ContractParser()
-    return _parser
+    return ContractParser()
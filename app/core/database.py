@@ -4,43 +4,151 @@ MongoDB Database Connection and Models
 Handles database connectivity and provides async database operations.
 """
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
+import zlib
+import orjson
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from app.config import get_settings
 
 # Global database client
 _mongodb_client: Optional[AsyncIOMotorClient] = None
 _mongodb_db: Optional[AsyncIOMotorDatabase] = None
+_code_bucket: Optional[AsyncIOMotorGridFSBucket] = None
+
+# Contract source is stored zlib-compressed; very large files go to GridFS
+CODE_CODEC = "zlib6"
+CODE_COMPRESS_LEVEL = 6
+GRIDFS_THRESHOLD = 512 * 1024
+
+# Persisted On-Demand chat sessions expire this long after creation
+AGENT_SESSION_TTL = 3600
+
+# Uploaded contracts are written in batches by a background flusher
+BATCH_MAX = 100
+FLUSH_MS = 50
+_insert_queue: Optional[asyncio.Queue] = None
+_flusher_task: Optional[asyncio.Task] = None
+
+# Queued by close_mongodb_connection to stop the flusher after its batch
+_FLUSH_STOP = object()
 
 
 async def connect_to_mongodb():
     """Initialize MongoDB connection."""
-    global _mongodb_client, _mongodb_db
+    global _mongodb_client, _mongodb_db, _code_bucket, _insert_queue, _flusher_task
     
     settings = get_settings()
     
     try:
-        _mongodb_client = AsyncIOMotorClient(settings.mongodb_url)
+        # Single-node acknowledgement (w=1) keeps upload inserts fast;
+        # compression shrinks the large contract source payloads on the wire
+        _mongodb_client = AsyncIOMotorClient(
+            settings.mongodb_url,
+            maxPoolSize=settings.mongodb_pool_size,
+            minPoolSize=8,
+            w=1,
+            retryWrites=True,
+            compressors=settings.mongodb_compressors
+        )
         _mongodb_db = _mongodb_client[settings.mongodb_db_name]
+        _code_bucket = AsyncIOMotorGridFSBucket(_mongodb_db, bucket_name="contract_code")
         
         # Test connection
         await _mongodb_client.admin.command('ping')
         print(f"✓ Connected to MongoDB: {settings.mongodb_db_name}")
         
-        # Create indexes
-        await _mongodb_db.uploaded_contracts.create_index("upload_id")
-        await _mongodb_db.uploaded_contracts.create_index("uploaded_at")
-        await _mongodb_db.uploaded_contracts.create_index("language")
+        # Create indexes in a single round-trip (idempotent)
+        try:
+            await _mongodb_db.uploaded_contracts.create_indexes([
+                IndexModel([("uploaded_at", -1)]),
+                IndexModel([("uploaded_at_ts", -1), ("uploaded_at", -1)]),
+                IndexModel([("language", 1), ("uploaded_at", -1)])
+            ])
+        except Exception as e:
+            print(f"⚠️  MongoDB index creation failed: {e}")
+        
+        # Separate, so an old conflicting index cannot block the others
+        await _ensure_unique_upload_id_index(_mongodb_db)
+        
+        try:
+            await _mongodb_db.agent_sessions.create_indexes([
+                IndexModel([("user_id", 1), ("agent_id", 1)], unique=True),
+                IndexModel([("updated_at", 1)], expireAfterSeconds=AGENT_SESSION_TTL)
+            ])
+        except Exception as e:
+            print(f"⚠️  MongoDB agent session index creation failed: {e}")
+        
+        # Start the batched insert flusher
+        _insert_queue = asyncio.Queue()
+        _flusher_task = asyncio.create_task(_flush_uploads())
         
     except Exception as e:
         print(f"✗ MongoDB connection failed: {e}")
         print("  Continuing without MongoDB - file upload will be disabled")
 
 
+async def _ensure_unique_upload_id_index(db: AsyncIOMotorDatabase):
+    """
+    Make the upload_id index unique.
+    
+    Older deployments have a non-unique index under the same name, which
+    MongoDB refuses to redefine in place; it is dropped and rebuilt.
+    """
+    collection = db.uploaded_contracts
+    
+    try:
+        await collection.create_index([("upload_id", 1)], unique=True)
+        return
+    except OperationFailure as e:
+        # 85: IndexOptionsConflict, 86: IndexKeySpecsConflict
+        if e.code not in (85, 86):
+            print(f"⚠️  MongoDB upload_id index creation failed: {e}")
+            return
+    except Exception as e:
+        print(f"⚠️  MongoDB upload_id index creation failed: {e}")
+        return
+    
+    try:
+        await collection.drop_index("upload_id_1")
+        await collection.create_index([("upload_id", 1)], unique=True)
+        print("✓ Replaced upload_id index with a unique one")
+    except Exception as e:
+        # e.g. duplicate upload_ids; keep lookups indexed regardless
+        print(f"⚠️  Could not make upload_id index unique: {e}")
+        try:
+            await collection.create_index([("upload_id", 1)])
+        except Exception:
+            pass
+
+
 async def close_mongodb_connection():
     """Close MongoDB connection."""
-    global _mongodb_client
+    global _mongodb_client, _flusher_task, _insert_queue
+    
+    if _flusher_task:
+        # Let the flusher write the batch it is collecting, then exit
+        await _insert_queue.put(_FLUSH_STOP)
+        try:
+            await _flusher_task
+        except (Exception, asyncio.CancelledError) as e:
+            print(f"⚠️  Upload flusher stopped with an error: {e}")
+        _flusher_task = None
+    
+    if _insert_queue is not None:
+        # Write anything queued after the stop marker before closing
+        pending = []
+        while not _insert_queue.empty():
+            item = _insert_queue.get_nowait()
+            if item is not _FLUSH_STOP:
+                pending.append(item)
+        _insert_queue = None
+        if pending:
+            await _insert_batch(pending)
     
     if _mongodb_client:
         _mongodb_client.close()
@@ -65,23 +173,95 @@ async def save_uploaded_contract(
     """
     Save an uploaded contract to MongoDB.
     
+    The document is queued and written by the background flusher in a
+    batched insert_many; this waits until that batch is acknowledged.
+    The source code is stored compressed (see _encode_code).
+    
     Returns the document ID.
     """
-    db = get_database()
+    get_database()
+    if _insert_queue is None:
+        raise RuntimeError("Upload queue is closed")
     
+    now = datetime.now(timezone.utc)
     document = {
         "upload_id": upload_id,
         "filename": filename,
         "language": language,
-        "code": code,
+        **await _encode_code(upload_id, code),
         "file_url": file_url,
         "analysis_result": analysis_result,
-        "uploaded_at": datetime.now(),
+        "uploaded_at": now,
+        "uploaded_at_ts": int(now.timestamp() * 1000),  # Epoch ms for sorting
         "analyzed": analysis_result is not None
     }
     
-    result = await db.uploaded_contracts.insert_one(document)
-    return str(result.inserted_id)
+    future = asyncio.get_running_loop().create_future()
+    await _insert_queue.put((document, future))
+    return await future
+
+
+async def _flush_uploads():
+    """
+    Drain the insert queue, writing up to BATCH_MAX documents per batch.
+    
+    Returns once _FLUSH_STOP is dequeued, after writing the batch that
+    was being collected.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = False
+    
+    while not stopping:
+        item = await _insert_queue.get()
+        if item is _FLUSH_STOP:
+            return
+        
+        batch = [item]
+        deadline = loop.time() + FLUSH_MS / 1000
+        
+        while len(batch) < BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_insert_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _FLUSH_STOP:
+                stopping = True
+                break
+            batch.append(item)
+        
+        await _insert_batch(batch)
+
+
+async def _insert_batch(batch: list[tuple[dict, asyncio.Future]]):
+    """Insert a batch of queued documents and resolve their futures."""
+    documents = [document for document, _ in batch]
+    failed: dict[int, Exception] = {}
+    
+    try:
+        try:
+            # Unordered so one bad document does not abort the rest
+            await _mongodb_db.uploaded_contracts.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = RuntimeError(error.get("errmsg", "Insert failed"))
+        except Exception as e:
+            failed = {i: e for i in range(len(batch))}
+        
+        for i, (document, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i in failed:
+                future.set_exception(failed[i])
+            else:
+                future.set_result(str(document["_id"]))
+    finally:
+        # Never leave a caller waiting, even if the insert was cancelled
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("Upload was not written"))
 
 
 async def get_uploaded_contract(upload_id: str) -> Optional[dict]:
@@ -91,16 +271,56 @@ async def get_uploaded_contract(upload_id: str) -> Optional[dict]:
     
     if contract:
         contract["_id"] = str(contract["_id"])
+        await _decode_code(contract)
     
     return contract
 
 
-async def get_recent_uploads(limit: int = 20) -> list[dict]:
-    """Get recent uploaded contracts."""
-    db = get_database()
+async def _encode_code(upload_id: str, code: str) -> dict:
+    """
+    Compress contract source for storage.
+    
+    Args:
+        upload_id: Upload ID, used as the GridFS filename
+        code: Contract source code
+        
+    Returns:
+        Document fields holding the code, inline or as a GridFS reference
+    """
+    compressed = zlib.compress(code.encode(), CODE_COMPRESS_LEVEL)
+    
+    if len(compressed) > GRIDFS_THRESHOLD:
+        file_id = await _code_bucket.upload_from_stream(upload_id, compressed)
+        return {"code_file_id": file_id, "code_codec": CODE_CODEC}
     
-    cursor = db.uploaded_contracts.find().sort("uploaded_at", -1).limit(limit)
-    contracts = await cursor.to_list(length=limit)
+    return {"code": Binary(compressed), "code_codec": CODE_CODEC}
+
+
+async def _decode_code(contract: dict):
+    """Restore the plain-text code field of a stored contract in place."""
+    codec = contract.pop("code_codec", None)
+    if codec is None:
+        # Stored before compression was introduced
+        return
+    
+    file_id = contract.pop("code_file_id", None)
+    if file_id is not None:
+        stream = await _code_bucket.open_download_stream(file_id)
+        compressed = await stream.read()
+    else:
+        compressed = contract["code"]
+    
+    contract["code"] = zlib.decompress(compressed).decode()
+
+
+# Listings leave out the large source and analysis payloads
+_CODE_PROJECTION = {"code": 0, "code_file_id": 0, "code_codec": 0}
+_LISTING_PROJECTION = {**_CODE_PROJECTION, "analysis_result": 0}
+
+
+async def get_recent_uploads(limit: int = 20) -> list[dict]:
+    """Get recent uploaded contracts, without their code or analysis."""
+    contracts = await _find_recent_uploads(limit)
     
     for contract in contracts:
         contract["_id"] = str(contract["_id"])
@@ -108,17 +328,95 @@ async def get_recent_uploads(limit: int = 20) -> list[dict]:
     return contracts
 
 
-async def update_contract_analysis(upload_id: str, analysis_result: dict):
-    """Update the analysis result for an uploaded contract."""
+async def get_recent_uploads_json(limit: int = 20) -> bytes:
+    """
+    Get recent uploaded contracts as a serialized JSON response body.
+    
+    Produces the same {"uploads": [...]} payload as serializing
+    get_recent_uploads(), without a per-document Python pass.
+    
+    Args:
+        limit: Maximum number of uploads to return
+        
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    contracts = await _find_recent_uploads(limit)
+    # ObjectId is the only non-native type left after projection
+    return orjson.dumps({"uploads": contracts}, default=str)
+
+
+async def _find_recent_uploads(limit: int) -> list[dict]:
+    """Fetch the most recent upload listings."""
     db = get_database()
+    # Uploads saved before uploaded_at_ts existed sort by uploaded_at
+    cursor = db.uploaded_contracts.find({}, _LISTING_PROJECTION).sort(
+        [("uploaded_at_ts", -1), ("uploaded_at", -1)]
+    ).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def update_contract_analysis(upload_id: str, analysis_result: dict) -> Optional[dict]:
+    """
+    Update the analysis result for an uploaded contract.
     
-    await db.uploaded_contracts.update_one(
+    Args:
+        upload_id: Upload ID of the contract
+        analysis_result: New analysis result
+        
+    Returns:
+        The updated document without its code, or None if not found
+    """
+    db = get_database()
+    
+    # Update and read back in one round-trip
+    contract = await db.uploaded_contracts.find_one_and_update(
         {"upload_id": upload_id},
         {
             "$set": {
                 "analysis_result": analysis_result,
                 "analyzed": True,
-                "analyzed_at": datetime.now()
+                "analyzed_at": datetime.now(timezone.utc)
             }
-        }
+        },
+        projection=_CODE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if contract:
+        contract["_id"] = str(contract["_id"])
+    
+    return contract
+
+
+async def load_agent_session(user_id: str, agent_id: str) -> Optional[str]:
+    """Get the persisted On-Demand session ID for a user and agent."""
+    db = get_database()
+    doc = await db.agent_sessions.find_one(
+        {"user_id": user_id, "agent_id": agent_id},
+        {"session_id": 1, "_id": 0}
+    )
+    return doc["session_id"] if doc else None
+
+
+async def save_agent_session(user_id: str, agent_id: str, session_id: str):
+    """Persist the On-Demand session ID for a user and agent."""
+    db = get_database()
+    await db.agent_sessions.update_one(
+        {"user_id": user_id, "agent_id": agent_id},
+        {
+            "$set": {
+                "session_id": session_id,
+                "updated_at": datetime.now(timezone.utc)
+            }
+        },
+        upsert=True
+    )
+
+
+async def delete_agent_session(user_id: str, agent_id: str, session_id: str):
+    """Forget a persisted session, unless it was already replaced."""
+    db = get_database()
+    await db.agent_sessions.delete_one(
+        {"user_id": user_id, "agent_id": agent_id, "session_id": session_id}
     )
@@ -0,0 +1,58 @@
+"""
+Logging Configuration
+
+Routes application log records through a queue so the actual stream I/O
+happens on a background thread instead of inside the event loop.
+"""
+
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Global queue handler and the listener draining it
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO):
+    """
+    Install a queue-backed handler on the root logger.
+    
+    Safe to call more than once; only the first call installs handlers.
+    
+    Args:
+        level: Root log level
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    root = logging.getLogger()
+    _queue_handler = QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the background listener."""
+    global _queue_handler, _listener
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _queue_handler = None
+        _listener = None
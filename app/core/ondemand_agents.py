@@ -7,13 +7,27 @@ compliance checking, and real-time threat detection.
 Uses On-Demand.io Chat API with advanced AI models for intelligent analysis.
 """
 
-import json
+import asyncio
+import hashlib
+import logging
 import os
+import time
 import uuid
 import httpx
-from typing import Optional, List, Dict, Any
+import orjson
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Mapping
 from datetime import datetime
 from app.config import get_settings
+from app.core.database import (
+    AGENT_SESSION_TTL,
+    load_agent_session,
+    save_agent_session,
+    delete_agent_session
+)
+
+logger = logging.getLogger(__name__)
 
 
 class OnDemandAgentManager:
@@ -68,6 +82,11 @@ class OnDemandAgentManager:
 - DeFi vulnerability trends
 
 Analyze smart contracts with extreme scrutiny. Provide specific line numbers, attack vectors, and risk assessments. Be direct about threats - user safety is paramount.""",
+            "system_prompt_compact": """Role: blockchain threat hunter.
+Check: reentrancy (single/cross-function/cross-contract); flash loan, MEV, front-running, sandwich; oracle/price manipulation; governance/vote attacks.
+Malicious signs: rug pull (hidden mint, ownership tricks); honeypot (transfer limits, fee tricks); backdoors, hidden admin; fake tokens.
+Intel: known attacker patterns, recent exploits, DeFi vuln trends.
+Output: attack vectors, line refs, risk per finding. Be direct.""",
             "capabilities": ["Attack Pattern Detection", "Rug Pull Analysis", "Honeypot Detection", "Exploit Identification"]
         },
         "compliance_auditor": {
@@ -99,6 +118,11 @@ Analyze smart contracts with extreme scrutiny. Provide specific line numbers, at
 - Upgrade and governance patterns
 
 Analyze contracts for regulatory compliance gaps. Provide specific recommendations with regulatory references. Flag potential securities law violations clearly.""",
+            "system_prompt_compact": """Role: blockchain regulatory compliance expert.
+Frameworks: SEC/Howey, EU MiCA, FATF Travel Rule, AML/KYC, FinCEN.
+Check: token class (utility vs security); DeFi licensing; stablecoin reserves/reporting; NFT marketplace rules; cross-border rules.
+Contract: disclosures, audit trail, user protection, emergency pause, upgrade/governance.
+Output: compliance gaps, fixes with regulatory refs; flag securities-law risk clearly.""",
             "capabilities": ["SEC Compliance", "MiCA Analysis", "AML/KYC Check", "Token Classification"]
         },
         "gas_wizard": {
@@ -135,6 +159,12 @@ Analyze contracts for regulatory compliance gaps. Provide specific recommendatio
 - Parallel execution patterns
 
 Provide specific gas savings estimates with before/after code examples. Prioritize optimizations by impact and implementation difficulty.""",
+            "system_prompt_compact": """Role: gas optimization expert (EVM/Move VM).
+Storage: slot packing, mapping vs array, transient storage, storage/memory/calldata.
+Compute: loops, short-circuits, unchecked math, assembly, precompiles.
+Patterns: batching, lazy eval, off-chain compute, event-based state, clones/proxies.
+Aptos/Move: resource efficiency, module layout, vector ops, parallel execution.
+Output: savings estimates, before/after code, ranked by impact vs effort.""",
             "capabilities": ["Storage Optimization", "Computation Analysis", "Batch Operations", "Cost Estimation"]
         },
         "defi_guardian": {
@@ -175,6 +205,13 @@ Provide specific gas savings estimates with before/after code examples. Prioriti
 - Auto-compounding risks
 
 Analyze DeFi contracts with focus on economic attacks and financial exploits. Provide exploit scenarios and mitigation strategies.""",
+            "system_prompt_compact": """Role: DeFi protocol security expert.
+Liquidity: pool manipulation/imbalance, impermanent loss abuse, LP tokens, bootstrapping.
+Lending: collateral ratio manipulation, liquidation exploits, rate manipulation, bad debt.
+Oracles: price feed manipulation, TWAP vs spot, Chainlink, Pyth/Switchboard (Aptos).
+Advanced: flash loans, composability, cross-protocol exploits.
+Yield: reward math, staking exploits, vaults, auto-compounding.
+Output: economic exploit scenarios + mitigations.""",
             "capabilities": ["Flash Loan Protection", "Oracle Security", "Liquidity Analysis", "Yield Safety"]
         },
         "audit_master": {
@@ -217,6 +254,12 @@ Analyze DeFi contracts with focus on economic attacks and financial exploits. Pr
 - Similar historical exploits
 
 Generate audit-ready reports that could be submitted to clients. Include specific code references and detailed remediation steps.""",
+            "system_prompt_compact": """Role: senior smart contract auditor.
+Method: static analysis, manual review, test coverage, formal verification recs.
+Severity: Critical=funds at immediate risk; High=significant; Medium=limited; Low=best practice; Info=code quality.
+Report: executive summary; scope/method; findings (title, severity, description, impact, PoC, fix); code quality; test coverage; recommendations.
+Cite CWE/SWC, OWASP, similar past exploits.
+Output: client-ready report with code refs and remediation steps.""",
             "capabilities": ["Full Audit Reports", "Severity Classification", "PoC Generation", "Fix Recommendations"]
         },
         "move_sensei": {
@@ -260,16 +303,127 @@ Generate audit-ready reports that could be submitted to clients. Include specifi
 - NFT (Digital Assets) standards
 
 Provide Move-specific guidance with code examples. Reference Aptos framework standards and Move language specifications.""",
+            "system_prompt_compact": """Role: Move and Aptos expert.
+Vulns: resource safety, capability misuse, acquires issues, module init, type confusion.
+Aptos: Coin/FungibleAsset, object model, account abstraction, scripts, multisig.
+Practices: resource management, abort codes, events, capability access control, upgrades.
+Prover: specs, invariants, formal verification, property tests.
+Framework: stdlib usage, module interactions, coin registration, Digital Assets.
+Output: Move-specific guidance with code, citing Aptos/Move standards.""",
             "capabilities": ["Resource Analysis", "Capability Check", "Move Prover", "Aptos Standards"]
         }
     }
     
+    # Maximum number of cached agent answers before the oldest is evicted
+    RESPONSE_CACHE_MAX_ENTRIES = 1024
+    
+    # Rendered context prefixes kept for reuse across agent fan-outs
+    PREFIX_CACHE_MAX_ENTRIES = 256
+    _PREFIX_KEYS = ("vulnerabilities", "contract_address", "transaction_data")
+    
+    # Remembered user sessions; user_id comes from clients, so this is capped
+    # and entries expire along with their persisted copies
+    USER_SESSION_MAX_ENTRIES = 1024
+    
+    # Contract code beyond this many characters is left out of queries
+    MAX_CONTEXT_CODE_CHARS = 8000
+    
+    # Stand-in for the query inside pre-encoded payload templates
+    _QUERY_PLACEHOLDER_VALUE = "__ONDEMAND_QUERY__"
+    _QUERY_PLACEHOLDER = b'"__ONDEMAND_QUERY__"'
+    
+    # "full" prompts read well for humans; "compact" ones carry the same
+    # instructions in roughly half the input tokens
+    PROMPT_MODES = ("full", "compact")
+    
+    # Pseudo agent that answers for every agent in one fused query
+    FUSED_AGENT_ID = "multi_agent"
+    
+    # Session creation is quick; queries wait on model inference
+    SESSION_TIMEOUT = 30.0
+    QUERY_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+    
     def __init__(self):
         """Initialize the agent manager with settings."""
         self.settings = get_settings()
         self.api_key = self.settings.ondemand_api_key
-        self._sessions: Dict[str, str] = {}  # user_id -> session_id
-        self._user_id = str(uuid.uuid4())  # Default user ID
+        # (user_id, agent_id) -> (expires_at, session_id), least recently used first
+        self._sessions: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+        self._user_id = uuid.uuid4().hex  # Default user ID
+        # Anonymous analysis sessions use a fixed external user per agent
+        self._agent_user_ids = {agent_id: uuid.uuid4().hex for agent_id in self.AGENTS}
+        self._response_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._prefix_cache: OrderedDict[tuple, str] = OrderedDict()
+        
+        # Bounds in-flight agent queries to stay under provider rate limits
+        self._agent_semaphore = asyncio.Semaphore(self.settings.ondemand_max_concurrency)
+        
+        # Prompt variant per agent; see set_prompt_mode for overrides
+        prompt_mode = self._check_prompt_mode(self.settings.ondemand_prompt_mode)
+        self._default_prompt_mode = prompt_mode
+        self._prompt_modes: Dict[str, str] = dict.fromkeys(self.AGENTS, prompt_mode)
+        self._fused_system_prompts: Dict[str, str] = {}
+        
+        # Encode every agent/model payload up front; unknown endpoint ids
+        # and other prompt modes are encoded on first use
+        self._payload_templates: Dict[tuple, bytes] = {}
+        for agent_id in self.AGENTS:
+            for endpoint_id in self.ENDPOINTS.values():
+                for response_mode in ("sync", "stream"):
+                    self._payload_template(agent_id, endpoint_id, response_mode, prompt_mode)
+        
+        # Shared pooled client so every call reuses warm TLS connections.
+        # Over HTTP/2 concurrent agent queries multiplex onto a few
+        # connections, so the pool stays small; the connection cap still
+        # leaves headroom if the server negotiates HTTP/1.1
+        self._client = httpx.AsyncClient(
+            base_url=self.BASE_URL,
+            # Auth and content type are identical on every call
+            headers={
+                "apikey": self.api_key,
+                "Content-Type": "application/json"
+            },
+            timeout=self.QUERY_TIMEOUT,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=8,
+                keepalive_expiry=60.0
+            )
+        )
+    
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        await self._client.aclose()
+    
+    def set_prompt_mode(self, prompt_mode: str, agent_id: Optional[str] = None):
+        """
+        Choose between the full and compact system prompts.
+        
+        Args:
+            prompt_mode: 'full' or 'compact'
+            agent_id: Only change this agent; changes all agents when omitted
+        """
+        prompt_mode = self._check_prompt_mode(prompt_mode)
+        if agent_id is None:
+            self._default_prompt_mode = prompt_mode
+            self._prompt_modes = dict.fromkeys(self.AGENTS, prompt_mode)
+        elif agent_id in self.AGENTS:
+            self._prompt_modes[agent_id] = prompt_mode
+        else:
+            raise ValueError(f"Unknown agent: {agent_id}")
+    
+    def _check_prompt_mode(self, prompt_mode: str) -> str:
+        """Validate a prompt mode name."""
+        if prompt_mode not in self.PROMPT_MODES:
+            raise ValueError(f"Unknown prompt mode: {prompt_mode}")
+        return prompt_mode
+    
+    def _resolve_prompt_mode(self, agent_id: str, prompt_mode: Optional[str]) -> str:
+        """Get the prompt mode for a query, preferring an explicit choice."""
+        if prompt_mode is not None:
+            return self._check_prompt_mode(prompt_mode)
+        return self._prompt_modes.get(agent_id, self._default_prompt_mode)
     
     async def create_session(
         self,
@@ -288,7 +442,7 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         Returns:
             Session ID if successful, None otherwise
         """
-        url = f"{self.BASE_URL}/sessions"
+        url = "/sessions"
         
         payload = {
             "externalUserId": user_id or self._user_id,
@@ -298,27 +452,28 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         if context_metadata:
             payload["contextMetadata"] = context_metadata
         
-        headers = {
-            "apikey": self.api_key,
-            "Content-Type": "application/json"
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, json=payload, headers=headers)
-                
-                if response.status_code == 201:
-                    data = response.json()
-                    session_id = data["data"]["id"]
-                    print(f"✅ Created On-Demand session: {session_id}")
-                    return session_id
-                else:
-                    print(f"❌ Session creation failed: {response.status_code} - {response.text}")
-                    return None
-                    
-            except Exception as e:
-                print(f"❌ Session creation error: {str(e)}")
+        try:
+            response = await self._client.post(
+                url,
+                content=orjson.dumps(payload),
+                timeout=self.SESSION_TIMEOUT
+            )
+            
+            if response.status_code == 201:
+                data = orjson.loads(response.content)
+                session_id = data["data"]["id"]
+                logger.info("Created On-Demand session %s", session_id)
+                return session_id
+            else:
+                logger.error(
+                    "Session creation failed: %s - %s",
+                    response.status_code, response.text
+                )
                 return None
+                
+        except Exception as e:
+            logger.exception("Session creation error: %s", e)
+            return None
     
     async def submit_query(
         self,
@@ -327,11 +482,16 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         agent_id: str,
         endpoint_id: str = "predefined-openai-gpt4o",
         response_mode: str = "sync",
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        cache: bool = True,
+        prompt_mode: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Submit a query to the On-Demand.io chat API.
         
+        Successful answers are cached by agent, model and full query, so
+        resubmitting the same contract and question skips the API call.
+        
         Args:
             session_id: The chat session ID
             query: User's question/query
@@ -339,110 +499,206 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
             endpoint_id: AI model endpoint to use
             response_mode: 'sync' or 'stream'
             context: Additional context (code, vulnerabilities, etc.)
+            cache: Whether to use the response cache
+            prompt_mode: 'full' or 'compact' system prompt (default: the
+                agent's configured mode)
         
         Returns:
             Response dictionary with answer and metadata
         """
-        url = f"{self.BASE_URL}/sessions/{session_id}/query"
+        url = f"/sessions/{session_id}/query"
         
-        # Get agent system prompt
         agent_info = self.AGENTS.get(agent_id, self.AGENTS["threat_hunter"])
-        system_prompt = agent_info["system_prompt"]
         
         # Build the full query with context
         full_query = self._build_query_with_context(query, context, agent_info)
+        prompt_mode = self._resolve_prompt_mode(agent_id, prompt_mode)
         
-        payload = {
-            "endpointId": endpoint_id,
-            "query": full_query,
-            "pluginIds": [],
-            "responseMode": response_mode,
-            "modelConfigs": {
-                "fulfillmentPrompt": system_prompt,
-                "temperature": 0.7,
-                "topP": 1,
-                "maxTokens": 4096,
-                "presencePenalty": 0,
-                "frequencyPenalty": 0
-            }
-        }
+        cache_key = None
+        if cache:
+            cache_key = hashlib.sha256(
+                f"{agent_id}|{endpoint_id}|{prompt_mode}|{full_query}".encode()
+            ).hexdigest()
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                return {**cached, "session_id": session_id}
         
-        headers = {
-            "apikey": self.api_key,
-            "Content-Type": "application/json"
-        }
+        # Splice the encoded query into the pre-encoded static payload
+        template = self._payload_template(agent_id, endpoint_id, response_mode, prompt_mode)
+        body = template.replace(self._QUERY_PLACEHOLDER, orjson.dumps(full_query), 1)
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                if response_mode == "sync":
-                    response = await client.post(url, json=payload, headers=headers)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        return {
-                            "success": True,
-                            "answer": data["data"]["answer"],
-                            "session_id": data["data"]["sessionId"],
-                            "message_id": data["data"]["messageId"],
-                            "status": data["data"]["status"]
-                        }
-                    else:
-                        print(f"❌ Query failed: {response.status_code} - {response.text}")
-                        return {
-                            "success": False,
-                            "error": f"API Error: {response.status_code}",
-                            "answer": self._get_fallback_response(agent_id, query, context)
-                        }
+        try:
+            if response_mode == "sync":
+                response = await self._client.post(url, content=body)
+                
+                if response.status_code == 200:
+                    data = orjson.loads(response.content)
+                    result = {
+                        "success": True,
+                        "answer": data["data"]["answer"],
+                        "session_id": data["data"]["sessionId"],
+                        "message_id": data["data"]["messageId"],
+                        "status": data["data"]["status"]
+                    }
                 else:
-                    # Streaming response
-                    return await self._handle_stream_response(client, url, payload, headers)
-                    
-            except Exception as e:
-                print(f"❌ Query error: {str(e)}")
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "answer": self._get_fallback_response(agent_id, query, context)
+                    logger.error(
+                        "Query failed: %s - %s",
+                        response.status_code, response.text
+                    )
+                    return {
+                        "success": False,
+                        "error": f"API Error: {response.status_code}",
+                        "answer": self._get_fallback_response(agent_id, query, context)
+                    }
+            else:
+                # Streaming response
+                result = await self._handle_stream_response(url, body)
+            
+            if cache_key is not None and result["success"]:
+                self._cache_response(cache_key, result)
+            return result
+                
+        except Exception as e:
+            logger.exception("Query error: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "answer": self._get_fallback_response(agent_id, query, context)
+            }
+    
+    def _payload_template(
+        self,
+        agent_id: str,
+        endpoint_id: str,
+        response_mode: str,
+        prompt_mode: str
+    ) -> bytes:
+        """
+        Get the encoded query payload for an agent, model, response mode
+        and prompt mode.
+        
+        Everything but the query is static, so the payload is encoded once
+        with a placeholder that submit_query replaces with the query.
+        """
+        key = (agent_id, endpoint_id, response_mode, prompt_mode)
+        template = self._payload_templates.get(key)
+        if template is None:
+            template = orjson.dumps({
+                "endpointId": endpoint_id,
+                "query": self._QUERY_PLACEHOLDER_VALUE,
+                "pluginIds": [],
+                "responseMode": response_mode,
+                "modelConfigs": {
+                    "fulfillmentPrompt": self._system_prompt(agent_id, prompt_mode),
+                    "temperature": 0.7,
+                    "topP": 1,
+                    "maxTokens": 4096,
+                    "presencePenalty": 0,
+                    "frequencyPenalty": 0
                 }
+            })
+            self._payload_templates[key] = template
+        return template
+    
+    def _system_prompt(self, agent_id: str, prompt_mode: str) -> str:
+        """Get the system prompt sent with an agent's queries."""
+        if agent_id == self.FUSED_AGENT_ID:
+            prompt = self._fused_system_prompts.get(prompt_mode)
+            if prompt is None:
+                prompt = self._build_fused_system_prompt(prompt_mode)
+                self._fused_system_prompts[prompt_mode] = prompt
+            return prompt
+        
+        agent_info = self.AGENTS.get(agent_id, self.AGENTS["threat_hunter"])
+        if prompt_mode == "compact":
+            return agent_info["system_prompt_compact"]
+        return agent_info["system_prompt"]
+    
+    def _build_fused_system_prompt(self, prompt_mode: str) -> str:
+        """Combine every agent's system prompt into one multi-section prompt."""
+        sections = "\n\n".join(
+            f"### {agent_id} ({info['name']})\n{self._system_prompt(agent_id, prompt_mode)}"
+            for agent_id, info in self.AGENTS.items()
+        )
+        return (
+            "You are a panel of blockchain security specialists analyzing one "
+            "smart contract. Each specialist is described below under its id.\n\n"
+            f"{sections}\n\n"
+            "Respond with a single JSON object and nothing else. Use each "
+            "requested specialist id as a key, with a value of the shape "
+            '{"severity": "critical|high|medium|low|info", "summary": "...", '
+            '"findings": ["..."]}.'
+        )
+    
+    def _cache_response(self, key: str, result: Dict[str, Any]):
+        """Store a successful answer, evicting the least recently used."""
+        self._response_cache[key] = result
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > self.RESPONSE_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
     
     async def _handle_stream_response(
         self,
-        client: httpx.AsyncClient,
         url: str,
-        payload: Dict,
-        headers: Dict
+        body: bytes
     ) -> Dict[str, Any]:
         """Handle streaming response from On-Demand API."""
         try:
-            async with client.stream("POST", url, json=payload, headers=headers) as response:
-                full_answer = ""
+            async with self._client.stream("POST", url, content=body) as response:
+                answer_parts = []
                 session_id = ""
                 message_id = ""
                 
-                async for line in response.aiter_lines():
-                    if line and line.startswith("data:"):
-                        data_str = line[5:].strip()
-                        
-                        if data_str == "[DONE]":
-                            break
-                        
-                        try:
-                            event = json.loads(data_str)
-                            
-                            if event.get("eventType") == "fulfillment":
-                                if "answer" in event:
-                                    full_answer += event["answer"]
-                                if "sessionId" in event:
-                                    session_id = event["sessionId"]
-                                if "messageId" in event:
-                                    message_id = event["messageId"]
-                                    
-                        except json.JSONDecodeError:
-                            continue
+                def handle_line(line: bytes) -> bool:
+                    """Process one SSE line; returns False at end of stream."""
+                    nonlocal session_id, message_id
+                    
+                    if not line.startswith(b"data:"):
+                        return True
+                    
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        return False
+                    
+                    try:
+                        event = orjson.loads(data)
+                    except orjson.JSONDecodeError:
+                        return True
+                    
+                    if event.get("eventType") == "fulfillment":
+                        if "answer" in event:
+                            answer_parts.append(event["answer"])
+                        if "sessionId" in event:
+                            session_id = event["sessionId"]
+                        if "messageId" in event:
+                            message_id = event["messageId"]
+                    return True
+                
+                # Frame the SSE stream on raw bytes; only "data:" lines are
+                # ever parsed, so nothing else is decoded
+                buffer = bytearray()
+                streaming = True
+                
+                async for chunk in response.aiter_bytes():
+                    buffer.extend(chunk)
+                    end = buffer.rfind(b"\n")
+                    if end == -1:
+                        continue
+                    
+                    lines = bytes(buffer[:end]).split(b"\n")
+                    del buffer[:end + 1]
+                    streaming = all(handle_line(line) for line in lines)
+                    if not streaming:
+                        break
+                
+                # Trailing line without a final newline
+                if streaming and buffer:
+                    handle_line(bytes(buffer))
                 
                 return {
                     "success": True,
-                    "answer": full_answer,
+                    "answer": "".join(answer_parts),
                     "session_id": session_id,
                     "message_id": message_id,
                     "status": "completed"
@@ -462,31 +718,59 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         agent_info: Dict
     ) -> str:
         """Build the full query with context information."""
+        prefix = self._context_prefix(context) if context else ""
+        return f"{prefix}## User Question:\n{query}"
+    
+    def _context_prefix(self, context: Dict[str, Any]) -> str:
+        """
+        Render the context sections that precede the user question.
+        
+        The rendering is memoized on the context contents, so fanning the
+        same contract out to several agents renders it only once.
+        """
+        code = context.get("code")
+        if code:
+            # No copy when the caller already truncated the code
+            code = code[:self.MAX_CONTEXT_CODE_CHARS]
+        
+        # The code string is part of the key itself: its hash is computed
+        # once and cached on the str, so repeat lookups do not rescan it
+        key = (
+            code,
+            context.get("language", "move"),
+            repr([(k, context[k]) for k in self._PREFIX_KEYS if k in context])
+        )
+        
+        prefix = self._prefix_cache.get(key)
+        if prefix is not None:
+            return prefix
+        
         parts = []
         
-        if context:
-            if "code" in context and context["code"]:
-                code = context["code"][:8000]  # Limit code length
-                language = context.get("language", "move")
-                parts.append(f"## Smart Contract Code ({language.upper()}):\n```{language}\n{code}\n```\n")
-            
-            if "vulnerabilities" in context and context["vulnerabilities"]:
-                vulns = context["vulnerabilities"]
-                if isinstance(vulns, list):
-                    vuln_text = "\n".join([f"- {v.get('type', 'Unknown')}: {v.get('description', 'No description')}" for v in vulns[:10]])
-                else:
-                    vuln_text = str(vulns)
-                parts.append(f"## Detected Vulnerabilities:\n{vuln_text}\n")
-            
-            if "contract_address" in context:
-                parts.append(f"## Contract Address: {context['contract_address']}\n")
-            
-            if "transaction_data" in context:
-                parts.append(f"## Transaction Data:\n{context['transaction_data']}\n")
+        if code:
+            language = context.get("language", "move")
+            parts.append(f"## Smart Contract Code ({language.upper()}):\n```{language}\n{code}\n```\n")
         
-        parts.append(f"## User Question:\n{query}")
+        if "vulnerabilities" in context and context["vulnerabilities"]:
+            vulns = context["vulnerabilities"]
+            if isinstance(vulns, list):
+                vuln_text = "\n".join([f"- {v.get('type', 'Unknown')}: {v.get('description', 'No description')}" for v in vulns[:10]])
+            else:
+                vuln_text = str(vulns)
+            parts.append(f"## Detected Vulnerabilities:\n{vuln_text}\n")
         
-        return "\n".join(parts)
+        if "contract_address" in context:
+            parts.append(f"## Contract Address: {context['contract_address']}\n")
+        
+        if "transaction_data" in context:
+            parts.append(f"## Transaction Data:\n{context['transaction_data']}\n")
+        
+        prefix = "".join(f"{part}\n" for part in parts)
+        
+        self._prefix_cache[key] = prefix
+        if len(self._prefix_cache) > self.PREFIX_CACHE_MAX_ENTRIES:
+            self._prefix_cache.popitem(last=False)
+        return prefix
     
     async def chat_with_agent(
         self,
@@ -494,21 +778,39 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         message: str,
         context: Optional[Dict[str, Any]] = None,
         session_id: Optional[str] = None,
-        model: str = "gpt4o"
+        model: str = "gpt4o",
+        user_id: Optional[str] = None,
+        prompt_mode: Optional[str] = None,
+        cache: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Main method to chat with a specific agent.
         
+        When a user_id is given and no session_id, the user's existing
+        session with this agent is reused, surviving restarts via MongoDB.
+        
+        Answers in an ongoing conversation depend on its history, so the
+        response cache is only used by default for one-off questions that
+        come with neither a session_id nor a user_id.
+        
         Args:
             agent_id: ID of the agent (threat_hunter, compliance_auditor, etc.)
             message: User's message
             context: Optional context with code, vulnerabilities, etc.
             session_id: Existing session ID for conversation continuity
             model: AI model to use (gpt4o, claude, grok, gemini)
+            user_id: Stable external user identifier for session reuse
+            prompt_mode: 'full' or 'compact' system prompt (default: the
+                agent's configured mode)
+            cache: Whether to use the response cache (default: only for
+                one-off questions)
         
         Returns:
             Agent response with analysis
         """
+        if cache is None:
+            cache = not session_id and not user_id
+        
         if agent_id not in self.AGENTS:
             return {
                 "success": False,
@@ -518,14 +820,12 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         
         agent_info = self.AGENTS[agent_id]
         
-        # Create session if needed
+        # Reuse the user's session or create one if needed
         if not session_id:
-            session_id = await self.create_session(
-                context_metadata=[
-                    {"key": "agent", "value": agent_id},
-                    {"key": "platform", "value": "aptos-comply-agent"}
-                ]
-            )
+            if user_id:
+                session_id = await self._get_user_session(user_id, agent_id)
+            else:
+                session_id = await self._create_agent_session(agent_id)
         
         if not session_id:
             # Fallback if session creation fails
@@ -550,9 +850,15 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
             agent_id=agent_id,
             endpoint_id=endpoint_id,
             response_mode="sync",
-            context=context
+            context=context,
+            cache=cache,
+            prompt_mode=prompt_mode
         )
         
+        if user_id and not result.get("success", False):
+            # The stored session may have expired upstream
+            await self._forget_user_session(user_id, agent_id, session_id)
+        
         return {
             "success": result.get("success", False),
             "agent_id": agent_id,
@@ -570,7 +876,9 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         self,
         code: str,
         language: str = "move",
-        include_agents: Optional[List[str]] = None
+        include_agents: Optional[List[str]] = None,
+        mode: str = "per_agent",
+        prompt_mode: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Analyze code with multiple agents in parallel.
@@ -579,51 +887,310 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
             code: Smart contract source code
             language: Programming language
             include_agents: Specific agents to use (default: all)
+            mode: 'per_agent' to query each agent in its own session, or
+                'fused' to ask all agents in one query
+            prompt_mode: 'full' or 'compact' system prompts (default: each
+                agent's configured mode)
         
         Returns:
             Combined analysis from all agents
         """
-        agents_to_use = include_agents or list(self.AGENTS.keys())
-        context = {"code": code, "language": language}
-        
-        agent_questions = {
-            "threat_hunter": "Analyze this smart contract for security threats, attack vectors, and malicious patterns. Identify any rug pull indicators, backdoors, or exploitable vulnerabilities.",
-            "compliance_auditor": "Review this contract for regulatory compliance. Check for SEC/MiCA requirements, required disclosures, and compliance gaps.",
-            "gas_wizard": "Analyze gas efficiency and provide specific optimization recommendations with estimated savings.",
-            "defi_guardian": "If this is a DeFi contract, analyze for flash loan vulnerabilities, oracle manipulation risks, and liquidity attack vectors.",
-            "audit_master": "Generate a professional audit summary with severity-rated findings and recommended fixes.",
-            "move_sensei": "Analyze Move-specific patterns, resource safety, and Aptos framework compliance."
+        if mode == "fused":
+            return await self.analyze_with_fused_prompt(
+                code, language, include_agents, prompt_mode=prompt_mode
+            )
+        if mode != "per_agent":
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        
+        agent_ids = self._analysis_agent_ids(include_agents)
+        collected = {}
+        
+        async for result in self.analyze_streaming(
+            code, language, include_agents=agent_ids, prompt_mode=prompt_mode
+        ):
+            collected[result["agent_id"]] = result
+        
+        # Report in the requested agent order, not completion order
+        results = {agent_id: collected[agent_id] for agent_id in agent_ids}
+        session_ids = {
+            agent_id: result.get("session_id") for agent_id, result in results.items()
+        }
+        
+        return {
+            "analysis_complete": True,
+            "agents_consulted": len(results),
+            # Kept for existing clients; each agent now has its own session
+            "session_id": next((sid for sid in session_ids.values() if sid), None),
+            "session_ids": session_ids,
+            "results": results,
+            "timestamp": datetime.now().isoformat()
         }
+    
+    async def analyze_streaming(
+        self,
+        code: str,
+        language: str = "move",
+        include_agents: Optional[List[str]] = None,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        prompt_mode: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze code with multiple agents, yielding each result as it completes.
+        
+        All agents are queried concurrently. When stop_when returns True for
+        a result, or the caller stops iterating, the agents still running are
+        cancelled, which also aborts their in-flight HTTP requests.
+        
+        Args:
+            code: Smart contract source code
+            language: Programming language
+            include_agents: Specific agents to use (default: all)
+            stop_when: Predicate on a result that ends the analysis early
+            prompt_mode: 'full' or 'compact' system prompts (default: each
+                agent's configured mode)
+        
+        Yields:
+            Per-agent results in completion order; failed agents yield an
+            error result with success set to False
+        """
+        agent_ids = self._analysis_agent_ids(include_agents)
+        # Truncate once here rather than once per agent query
+        context = {"code": code[:self.MAX_CONTEXT_CODE_CHARS], "language": language}
+        
+        tasks = [
+            asyncio.create_task(self._analyze_with_agent(agent_id, context, prompt_mode))
+            for agent_id in agent_ids
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                yield result
+                if stop_when is not None and stop_when(result):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def analyze_with_fused_prompt(
+        self,
+        code: str,
+        language: str = "move",
+        include_agents: Optional[List[str]] = None,
+        prompt_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze code with multiple agents in a single model query.
+        
+        The contract is sent once with every agent's instructions and the
+        model answers with one JSON section per agent, which is fanned out
+        into the same shape analyze_with_all_agents returns. If the query
+        fails or its answer is not valid JSON, the per-agent path is used.
+        
+        Args:
+            code: Smart contract source code
+            language: Programming language
+            include_agents: Specific agents to use (default: all)
+            prompt_mode: 'full' or 'compact' system prompts
+        
+        Returns:
+            Combined analysis from all agents
+        """
+        agent_ids = self._analysis_agent_ids(include_agents)
+        context = {"code": code[:self.MAX_CONTEXT_CODE_CHARS], "language": language}
+        
+        session_id = await self._create_agent_session(self.FUSED_AGENT_ID)
+        sections = None
         
+        if session_id:
+            tasks = "\n".join(
+                f"- {agent_id}: {_AGENT_QUESTIONS[agent_id]}" for agent_id in agent_ids
+            )
+            result = await self.submit_query(
+                session_id=session_id,
+                query=f"Answer as these specialists only:\n{tasks}",
+                agent_id=self.FUSED_AGENT_ID,
+                endpoint_id=self.ENDPOINTS["gpt4o"],
+                context=context,
+                prompt_mode=prompt_mode
+            )
+            if result.get("success"):
+                session_id = result.get("session_id") or session_id
+                sections = _parse_fused_answer(result.get("answer", ""))
+        
+        if sections is None:
+            logger.warning("Fused analysis unavailable, querying agents individually")
+            return await self.analyze_with_all_agents(
+                code, language, agent_ids, prompt_mode=prompt_mode
+            )
+        
+        timestamp = datetime.now().isoformat()
         results = {}
-        session_id = await self.create_session()
-        
-        for agent_id in agents_to_use:
-            if agent_id in agent_questions:
-                try:
-                    result = await self.chat_with_agent(
-                        agent_id=agent_id,
-                        message=agent_questions[agent_id],
-                        context=context,
-                        session_id=session_id
-                    )
-                    results[agent_id] = result
-                except Exception as e:
-                    results[agent_id] = {
-                        "success": False,
-                        "agent_id": agent_id,
-                        "message": f"Error: {str(e)}",
-                        "timestamp": datetime.now().isoformat()
-                    }
+        
+        for agent_id in agent_ids:
+            agent_info = self.AGENTS[agent_id]
+            section = sections.get(agent_id)
+            if not isinstance(section, dict):
+                results[agent_id] = {
+                    "success": False,
+                    "agent_id": agent_id,
+                    "message": "Error: no analysis returned for this agent",
+                    "session_id": session_id,
+                    "timestamp": timestamp
+                }
+                continue
+            
+            results[agent_id] = {
+                "success": True,
+                "agent_id": agent_id,
+                "agent_name": agent_info["name"],
+                "message": _render_fused_section(section),
+                "session_id": session_id,
+                "timestamp": timestamp,
+                "fallback": False,
+                "capabilities": agent_info.get("capabilities", []),
+                "model_used": "gpt4o",
+                "severity": section.get("severity"),
+                "findings": section.get("findings", [])
+            }
         
         return {
             "analysis_complete": True,
             "agents_consulted": len(results),
             "session_id": session_id,
+            "session_ids": {agent_id: session_id for agent_id in results},
             "results": results,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
     
+    def _analysis_agent_ids(self, include_agents: Optional[List[str]]) -> List[str]:
+        """Agents to run for an analysis, limited to those with a question."""
+        agents_to_use = include_agents or list(self.AGENTS.keys())
+        return [a for a in agents_to_use if a in _AGENT_QUESTIONS]
+    
+    async def _analyze_with_agent(
+        self,
+        agent_id: str,
+        context: Dict[str, Any],
+        prompt_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Ask one agent its analysis question, returning an error result on failure."""
+        session_id = None
+        
+        async def ask() -> Dict[str, Any]:
+            nonlocal session_id
+            # One session per agent keeps each agent's context separate
+            session_id = await self._create_agent_session(agent_id)
+            # The session is fresh, so the answer depends only on the code
+            return await self.chat_with_agent(
+                agent_id=agent_id,
+                message=_AGENT_QUESTIONS[agent_id],
+                context=context,
+                session_id=session_id,
+                prompt_mode=prompt_mode,
+                cache=True
+            )
+        
+        try:
+            return await self._run_agent_bounded(agent_id, ask)
+        except Exception as e:
+            return {
+                "success": False,
+                "agent_id": agent_id,
+                "message": f"Error: {str(e)}",
+                "session_id": session_id,
+                "timestamp": datetime.now().isoformat()
+            }
+    
+    async def _run_agent_bounded(
+        self,
+        agent_id: str,
+        call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Run an agent call under the concurrency limit and per-agent timeout.
+        
+        Session creation belongs inside call, so it is bounded as well.
+        
+        Raises:
+            TimeoutError: If the agent does not answer in time
+        """
+        timeout = self.settings.ondemand_agent_timeout
+        async with self._agent_semaphore:
+            try:
+                return await asyncio.wait_for(call(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Agent {agent_id} timed out after {timeout:g}s")
+    
+    async def _create_agent_session(
+        self,
+        agent_id: str,
+        user_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Create a session tagged with the agent it belongs to."""
+        return await self.create_session(
+            user_id=user_id or self._agent_user_ids.get(agent_id),
+            context_metadata=[
+                {"key": "agent", "value": agent_id},
+                {"key": "platform", "value": "aptos-comply-agent"}
+            ]
+        )
+    
+    async def _get_user_session(self, user_id: str, agent_id: str) -> Optional[str]:
+        """
+        Get a user's session with an agent, creating it on first use.
+        
+        Sessions are cached in process and persisted to MongoDB so other
+        workers and restarts skip session creation. MongoDB is optional;
+        without it sessions are only cached in process.
+        """
+        key = (user_id, agent_id)
+        entry = self._sessions.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._sessions.move_to_end(key)
+                return entry[1]
+            del self._sessions[key]
+        
+        session_id = None
+        try:
+            session_id = await load_agent_session(user_id, agent_id)
+        except RuntimeError:
+            pass  # MongoDB not connected
+        except Exception as e:
+            logger.warning("Could not load persisted agent session: %s", e)
+        
+        if not session_id:
+            session_id = await self._create_agent_session(agent_id, user_id=user_id)
+            if not session_id:
+                return None
+            try:
+                await save_agent_session(user_id, agent_id, session_id)
+            except RuntimeError:
+                pass  # MongoDB not connected
+            except Exception as e:
+                logger.warning("Could not persist agent session: %s", e)
+        
+        self._sessions[key] = (time.monotonic() + AGENT_SESSION_TTL, session_id)
+        self._sessions.move_to_end(key)
+        if len(self._sessions) > self.USER_SESSION_MAX_ENTRIES:
+            self._sessions.popitem(last=False)
+        return session_id
+    
+    async def _forget_user_session(self, user_id: str, agent_id: str, session_id: str):
+        """Drop a user's cached session if it is still the current one."""
+        key = (user_id, agent_id)
+        entry = self._sessions.get(key)
+        if entry is not None and entry[1] == session_id:
+            del self._sessions[key]
+        try:
+            await delete_agent_session(user_id, agent_id, session_id)
+        except RuntimeError:
+            pass  # MongoDB not connected
+        except Exception as e:
+            logger.warning("Could not delete persisted agent session: %s", e)
+    
     def _get_fallback_response(
         self,
         agent_id: str,
@@ -631,8 +1198,59 @@ Provide Move-specific guidance with code examples. Reference Aptos framework sta
         context: Optional[Dict] = None
     ) -> str:
         """Generate intelligent fallback responses when API is unavailable."""
-        fallback_responses = {
-            "threat_hunter": """## 🎯 Threat Analysis (Fallback Mode)
+        template = _FALLBACK_RESPONSES.get(agent_id)
+        if template is None:
+            return _DEFAULT_FALLBACK_RESPONSE
+        if agent_id == "audit_master":
+            return template.format(ts=datetime.now().strftime('%Y-%m-%d %H:%M'))
+        return template
+    
+    def get_all_agents(self) -> List[Mapping[str, Any]]:
+        """Get information about all available agents."""
+        return list(_ALL_AGENTS_PUBLIC)
+    
+    def get_agent_info(self, agent_id: str) -> Optional[Mapping[str, Any]]:
+        """Get information about a specific agent."""
+        return _AGENT_INFO_FULL.get(agent_id)
+
+
+# Read-only agent listings, built once from the static AGENTS table
+_ALL_AGENTS_PUBLIC = tuple(
+    MappingProxyType({
+        "id": agent_id,
+        "name": info["name"],
+        "description": info["description"],
+        "icon": info["icon"],
+        "color": info["color"],
+        "capabilities": tuple(info.get("capabilities", []))
+    })
+    for agent_id, info in OnDemandAgentManager.AGENTS.items()
+)
+
+_AGENT_INFO_FULL = {
+    public["id"]: MappingProxyType({
+        **public,
+        "system_prompt": OnDemandAgentManager.AGENTS[public["id"]]["system_prompt"],
+        "system_prompt_compact": OnDemandAgentManager.AGENTS[public["id"]]["system_prompt_compact"]
+    })
+    for public in _ALL_AGENTS_PUBLIC
+}
+
+
+# Question each agent is asked during a multi-agent analysis
+_AGENT_QUESTIONS: Dict[str, str] = {
+    "threat_hunter": "Analyze this smart contract for security threats, attack vectors, and malicious patterns. Identify any rug pull indicators, backdoors, or exploitable vulnerabilities.",
+    "compliance_auditor": "Review this contract for regulatory compliance. Check for SEC/MiCA requirements, required disclosures, and compliance gaps.",
+    "gas_wizard": "Analyze gas efficiency and provide specific optimization recommendations with estimated savings.",
+    "defi_guardian": "If this is a DeFi contract, analyze for flash loan vulnerabilities, oracle manipulation risks, and liquidity attack vectors.",
+    "audit_master": "Generate a professional audit summary with severity-rated findings and recommended fixes.",
+    "move_sensei": "Analyze Move-specific patterns, resource safety, and Aptos framework compliance."
+}
+
+# Canned agent answers used when the On-Demand API is unavailable; the
+# audit_master template takes the generation time as {ts}
+_FALLBACK_RESPONSES: Dict[str, str] = {
+    "threat_hunter": """## 🎯 Threat Analysis (Fallback Mode)
 
 Based on static analysis patterns, here are key security checks to perform:
 
@@ -650,7 +1268,7 @@ Based on static analysis patterns, here are key security checks to perform:
 
 *Note: For comprehensive threat analysis, please try again when the AI service is available.*""",
 
-            "compliance_auditor": """## ⚖️ Compliance Review (Fallback Mode)
+    "compliance_auditor": """## ⚖️ Compliance Review (Fallback Mode)
 
 ### Regulatory Checklist:
 
@@ -671,7 +1289,7 @@ Based on static analysis patterns, here are key security checks to perform:
 
 *Note: For detailed regulatory analysis, please try again when the AI service is available.*""",
 
-            "gas_wizard": """## ⛽ Gas Optimization (Fallback Mode)
+    "gas_wizard": """## ⛽ Gas Optimization (Fallback Mode)
 
 ### Quick Optimization Tips:
 
@@ -692,7 +1310,7 @@ Based on static analysis patterns, here are key security checks to perform:
 
 *Note: For specific gas estimates, please try again when the AI service is available.*""",
 
-            "defi_guardian": """## 🏦 DeFi Security (Fallback Mode)
+    "defi_guardian": """## 🏦 DeFi Security (Fallback Mode)
 
 ### Security Checklist:
 
@@ -713,10 +1331,10 @@ Based on static analysis patterns, here are key security checks to perform:
 
 *Note: For comprehensive DeFi analysis, please try again when the AI service is available.*""",
 
-            "audit_master": f"""## 📋 Audit Summary (Fallback Mode)
+    "audit_master": """## 📋 Audit Summary (Fallback Mode)
 
 **Contract Analysis Report**
-*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*
+*Generated: {ts}*
 
 ### Scope
 - Manual pattern matching analysis
@@ -739,7 +1357,7 @@ Based on static analysis patterns, here are key security checks to perform:
 
 *Note: For professional audit report, please try again when the AI service is available.*""",
 
-            "move_sensei": """## 🥋 Move Analysis (Fallback Mode)
+    "move_sensei": """## 🥋 Move Analysis (Fallback Mode)
 
 ### Move/Aptos Security Checklist:
 
@@ -764,38 +1382,40 @@ Based on static analysis patterns, here are key security checks to perform:
 - Implement proper abort codes
 
 *Note: For detailed Move analysis, please try again when the AI service is available.*"""
-        }
-        
-        return fallback_responses.get(agent_id, "I'm here to help with smart contract analysis. Please try again when the service is available.")
-    
-    def get_all_agents(self) -> List[Dict[str, Any]]:
-        """Get information about all available agents."""
-        return [
-            {
-                "id": agent_id,
-                "name": info["name"],
-                "description": info["description"],
-                "icon": info["icon"],
-                "color": info["color"],
-                "capabilities": info.get("capabilities", [])
-            }
-            for agent_id, info in self.AGENTS.items()
-        ]
+}
+
+_DEFAULT_FALLBACK_RESPONSE = "I'm here to help with smart contract analysis. Please try again when the service is available."
+
+
+def _parse_fused_answer(answer: str) -> Optional[Dict[str, Any]]:
+    """Extract the per-agent JSON object from a fused query answer."""
+    # Models often wrap JSON in a markdown fence or a sentence
+    start = answer.find("{")
+    end = answer.rfind("}")
+    if start == -1 or end < start:
+        return None
     
-    def get_agent_info(self, agent_id: str) -> Optional[Dict[str, Any]]:
-        """Get information about a specific agent."""
-        if agent_id in self.AGENTS:
-            info = self.AGENTS[agent_id]
-            return {
-                "id": agent_id,
-                "name": info["name"],
-                "description": info["description"],
-                "icon": info["icon"],
-                "color": info["color"],
-                "capabilities": info.get("capabilities", []),
-                "system_prompt": info["system_prompt"]
-            }
+    try:
+        sections = orjson.loads(answer[start:end + 1])
+    except orjson.JSONDecodeError:
         return None
+    return sections if isinstance(sections, dict) else None
+
+
+def _render_fused_section(section: Dict[str, Any]) -> str:
+    """Render one agent's section of a fused answer as markdown."""
+    lines = [f"**Severity:** {section.get('severity', 'unknown')}"]
+    
+    summary = section.get("summary")
+    if summary:
+        lines.append(f"\n{summary}")
+    
+    findings = section.get("findings") or []
+    if findings:
+        lines.append("\n**Findings:**")
+        lines.extend(f"- {finding}" for finding in findings)
+    
+    return "\n".join(lines)
 
 
 # Singleton instance
@@ -808,3 +1428,11 @@ def get_agent_manager() -> OnDemandAgentManager:
     if _agent_manager is None:
         _agent_manager = OnDemandAgentManager()
     return _agent_manager
+
+
+async def close_agent_manager():
+    """Close the agent manager's HTTP client if it was created."""
+    global _agent_manager
+    if _agent_manager is not None:
+        await _agent_manager.aclose()
+        _agent_manager = None
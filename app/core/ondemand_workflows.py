@@ -13,11 +13,31 @@ Uses On-Demand.io Workflow Activation API:
 POST https://api.on-demand.io/automation/api/workflow/{id}/activate
 """
 
+import time
 import httpx
+import orjson
+from types import MappingProxyType
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from app.config import get_settings
 
+# Last formatted wall-clock time as [epoch seconds, ISO string]
+_ISO_CACHE = [0.0, ""]
+
+
+def _now_iso() -> str:
+    """
+    Get the current local time as an ISO string.
+    
+    The formatted value is reused for up to a second, which is fine for
+    informational timestamps like execution_time.
+    """
+    now = time.time()
+    if now - _ISO_CACHE[0] > 1.0:
+        _ISO_CACHE[0] = now
+        _ISO_CACHE[1] = datetime.fromtimestamp(now).isoformat()
+    return _ISO_CACHE[1]
+
 
 class OnDemandWorkflowManager:
     """
@@ -55,6 +75,34 @@ class OnDemandWorkflowManager:
         """Initialize the workflow manager."""
         settings = get_settings()
         self.api_key = settings.ondemand_api_key
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def startup(self):
+        """Create the shared HTTP client; safe to call more than once."""
+        if self._client is not None:
+            return
+        
+        # One pooled client keeps TLS connections to On-Demand warm
+        # across activations
+        self._client = httpx.AsyncClient(
+            base_url=self.AUTOMATION_API_URL,
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=300
+            ),
+            headers={
+                "apikey": self.api_key,
+                "Content-Type": "application/json"
+            }
+        )
+    
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def activate_workflow(self, workflow_id: str) -> Dict[str, Any]:
         """
@@ -68,54 +116,7 @@ class OnDemandWorkflowManager:
         Returns:
             Dict containing activation status and details
         """
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                # Activation endpoint - POST with apikey header
-                url = f"{self.AUTOMATION_API_URL}/workflow/{workflow_id}/activate"
-                
-                response = await client.post(
-                    url,
-                    headers={
-                        "apikey": self.api_key,
-                        "Content-Type": "application/json"
-                    }
-                )
-                
-                # Try to parse JSON response
-                result = None
-                try:
-                    if response.content:
-                        result = response.json()
-                except Exception:
-                    result = None
-                
-                if response.status_code == 200 or response.status_code == 201:
-                    return {
-                        "success": True,
-                        "workflow_id": workflow_id,
-                        "execution_id": result.get("execution_id", "") if result else "",
-                        "status": result.get("status", "activated") if result else "activated",
-                        "message": result.get("message", "Workflow activated successfully") if result else "Workflow activated successfully",
-                        "response_data": result,
-                        "execution_time": datetime.now().isoformat()
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "workflow_id": workflow_id,
-                        "error": f"HTTP {response.status_code}: {response.text}",
-                        "url": url,
-                        "response_data": result,
-                        "execution_time": datetime.now().isoformat()
-                    }
-        except Exception as e:
-            return {
-                "success": False,
-                "workflow_id": workflow_id,
-                "error": f"Exception: {str(e)}",
-                "error_type": type(e).__name__,
-                "execution_time": datetime.now().isoformat()
-            }
+        return await self._post_workflow(workflow_id, "activate", "activated")
     
     async def trigger_workflow(self, workflow_id: str) -> Dict[str, Any]:
         """
@@ -130,72 +131,70 @@ class OnDemandWorkflowManager:
         Returns:
             Dict containing execution status and details
         """
+        return await self._post_workflow(workflow_id, "execute", "executed")
+    
+    async def _post_workflow(
+        self,
+        workflow_id: str,
+        action: str,
+        default_status: str
+    ) -> Dict[str, Any]:
+        """
+        POST a workflow action and normalize the response.
+        
+        Args:
+            workflow_id: The workflow ID from On-Demand.io platform
+            action: Endpoint suffix ('activate' or 'execute')
+            default_status: Status reported when the API does not return one
+            
+        Returns:
+            Dict containing the action status and details
+        """
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                # Execution endpoint - POST with apikey header
-                url = f"{self.AUTOMATION_API_URL}/workflow/{workflow_id}/execute"
-                
-                response = await client.post(
-                    url,
-                    headers={
-                        "apikey": self.api_key,
-                        "Content-Type": "application/json"
-                    }
-                )
-                
-                # Try to parse JSON response
+            if self._client is None:
+                await self.startup()
+            
+            # Auth headers are set on the shared client
+            response = await self._client.post(f"/workflow/{workflow_id}/{action}")
+            
+            # Empty or non-JSON bodies are reported as no response data
+            try:
+                result = orjson.loads(response.content) if response.content else None
+            except orjson.JSONDecodeError:
                 result = None
-                try:
-                    if response.content:
-                        result = response.json()
-                except Exception:
-                    result = None
-                
-                if response.status_code == 200 or response.status_code == 201:
-                    return {
-                        "success": True,
-                        "workflow_id": workflow_id,
-                        "execution_id": result.get("execution_id", "") if result else "",
-                        "status": result.get("status", "executed") if result else "executed",
-                        "message": result.get("message", "Workflow executed successfully") if result else "Workflow executed successfully",
-                        "response_data": result,
-                        "execution_time": datetime.now().isoformat()
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "workflow_id": workflow_id,
-                        "error": f"HTTP {response.status_code}: {response.text}",
-                        "url": url,
-                        "response_data": result,
-                        "execution_time": datetime.now().isoformat()
-                    }
+            
+            if response.status_code == 200 or response.status_code == 201:
+                default_message = f"Workflow {default_status} successfully"
+                return {
+                    "success": True,
+                    "workflow_id": workflow_id,
+                    "execution_id": result.get("execution_id", "") if result else "",
+                    "status": result.get("status", default_status) if result else default_status,
+                    "message": result.get("message", default_message) if result else default_message,
+                    "response_data": result,
+                    "execution_time": _now_iso()
+                }
+            else:
+                return {
+                    "success": False,
+                    "workflow_id": workflow_id,
+                    "error": f"HTTP {response.status_code}: {response.text}",
+                    "url": str(response.url),
+                    "response_data": result,
+                    "execution_time": _now_iso()
+                }
         except Exception as e:
             return {
                 "success": False,
                 "workflow_id": workflow_id,
                 "error": f"Exception: {str(e)}",
                 "error_type": type(e).__name__,
-                "execution_time": datetime.now().isoformat()
+                "execution_time": _now_iso()
             }
     
     def get_all_workflows(self) -> List[Dict[str, Any]]:
         """Get all available workflow definitions."""
-        return [
-            {
-                "id": w["id"],
-                "name": w["name"],
-                "tagline": w["tagline"],
-                "description": w["description"],
-                "icon": w["icon"],
-                "gradient": w["gradient"],
-                "accentColor": w["accentColor"],
-                "trigger_type": w["trigger_type"],
-                "steps": w["steps"],
-                "params": w.get("params", {})
-            }
-            for key, w in self.WORKFLOWS.items()
-        ]
+        return list(_WORKFLOWS_PUBLIC)
     
     def get_workflow(self, workflow_key: str) -> Optional[Dict[str, Any]]:
         """Get a specific workflow definition by key."""
@@ -203,10 +202,28 @@ class OnDemandWorkflowManager:
     
     def get_workflow_by_id(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific workflow definition by ID."""
-        for key, workflow in self.WORKFLOWS.items():
-            if workflow["id"] == workflow_id:
-                return workflow
-        return None
+        return _WORKFLOWS_BY_ID.get(workflow_id)
+
+
+# Read-only workflow listing, built once from the static WORKFLOWS table
+_WORKFLOWS_PUBLIC = tuple(
+    MappingProxyType({
+        "id": w["id"],
+        "name": w["name"],
+        "tagline": w["tagline"],
+        "description": w["description"],
+        "icon": w["icon"],
+        "gradient": w["gradient"],
+        "accentColor": w["accentColor"],
+        "trigger_type": w["trigger_type"],
+        "steps": tuple(MappingProxyType(step) for step in w["steps"]),
+        "params": MappingProxyType(w.get("params", {}))
+    })
+    for w in OnDemandWorkflowManager.WORKFLOWS.values()
+)
+
+# Workflow definitions keyed by their On-Demand.io ID
+_WORKFLOWS_BY_ID = {w["id"]: w for w in OnDemandWorkflowManager.WORKFLOWS.values()}
 
 
 # Global instance
@@ -2,10 +2,13 @@
 Transaction Monitor
 
 Real-time monitoring of Aptos blockchain transactions.
-Polls for new transactions and streams them for analysis.
+Streams (or polls) new transactions and hands them off for analysis.
 """
 
 import asyncio
+import logging
+import sys
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable, Optional
@@ -14,30 +17,40 @@ from collections import deque
 from app.config import get_settings
 from app.core.aptos_client import get_aptos_client
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(slots=True)
 class TransactionEvent:
     """Represents a monitored transaction event."""
     hash: str
     version: int
     sender: str
     type: str
-    timestamp: datetime
+    timestamp_us: int  # Microseconds since the epoch, as reported by Aptos
     success: bool
     gas_used: int
     payload: dict[str, Any] = field(default_factory=dict)
     changes: list[dict[str, Any]] = field(default_factory=list)
-    raw: dict[str, Any] = field(default_factory=dict)
+    raw: Optional[dict[str, Any]] = None  # Only kept when monitor_keep_raw is set
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Transaction time as a datetime, built on access."""
+        return datetime.fromtimestamp(self.timestamp_us / 1_000_000)
 
 
 class TransactionMonitor:
     """
     Real-time transaction monitor for Aptos blockchain.
     
-    Polls for new transactions and notifies registered callbacks
+    Follows new transactions and notifies registered callbacks
     when new transactions are detected.
     """
     
+    # Page size when streaming; the Aptos node caps pages at 100
+    STREAM_BATCH_SIZE = 100
+    
     def __init__(self):
         self.settings = get_settings()
         self._running = False
@@ -46,6 +59,7 @@ class TransactionMonitor:
         self._last_version: Optional[int] = None
         self._recent_transactions: deque[TransactionEvent] = deque(maxlen=100)
         self._monitored_addresses: set[str] = set()
+        self._address_snapshot: Optional[tuple[str, ...]] = None
         self._task: Optional[asyncio.Task] = None
     
     def add_callback(self, callback: Callable[[TransactionEvent], None]):
@@ -67,13 +81,21 @@ class TransactionMonitor:
         """Add an address to monitor specifically."""
         if not address.startswith("0x"):
             address = f"0x{address}"
-        self._monitored_addresses.add(address.lower())
+        self._monitored_addresses.add(sys.intern(address.lower()))
+        self._address_snapshot = None
     
     def remove_monitored_address(self, address: str):
         """Remove an address from monitoring."""
         if not address.startswith("0x"):
             address = f"0x{address}"
         self._monitored_addresses.discard(address.lower())
+        self._address_snapshot = None
+    
+    def snapshot_addresses(self) -> tuple[str, ...]:
+        """Get a sorted, cached snapshot of the monitored addresses."""
+        if self._address_snapshot is None:
+            self._address_snapshot = tuple(sorted(self._monitored_addresses))
+        return self._address_snapshot
     
     @property
     def is_running(self) -> bool:
@@ -82,9 +104,14 @@ class TransactionMonitor:
     
     @property
     def recent_transactions(self) -> list[TransactionEvent]:
-        """Get recent transactions."""
+        """Get a copy of the recent transactions."""
         return list(self._recent_transactions)
     
+    @property
+    def recent_transactions_view(self) -> deque[TransactionEvent]:
+        """Get the recent transactions buffer itself, for read-only use."""
+        return self._recent_transactions
+    
     async def start(self):
         """Start the transaction monitor."""
         if self._running:
@@ -112,15 +139,41 @@ class TransactionMonitor:
         try:
             ledger_info = await client.get_ledger_info()
             self._last_version = int(ledger_info.get("ledger_version", 0))
-        except Exception as e:
-            print(f"Error getting initial ledger info: {e}")
+        except Exception:
+            logger.exception("Error getting initial ledger info")
             self._last_version = 0
         
+        if self.settings.monitor_mode == "poll":
+            await self._poll_loop(client)
+        else:
+            await self._stream_loop(client)
+    
+    async def _stream_loop(self, client):
+        """Follow new transactions continuously, restarting after errors."""
+        while self._running:
+            try:
+                if not self._last_version:
+                    # Never stream from genesis; start at the ledger head
+                    ledger_info = await client.get_ledger_info()
+                    self._last_version = int(ledger_info.get("ledger_version", 0))
+                
+                async for transactions in client.stream_transactions(
+                    start=self._last_version + 1,
+                    batch_size=self.STREAM_BATCH_SIZE,
+                    idle_interval=self.settings.monitor_poll_interval
+                ):
+                    await self._process_transactions(transactions)
+            except Exception:
+                logger.exception("Error streaming transactions")
+                await asyncio.sleep(self.settings.monitor_poll_interval)
+    
+    async def _poll_loop(self, client):
+        """Poll for new transactions at a fixed interval."""
         while self._running:
             try:
                 await self._poll_transactions(client)
-            except Exception as e:
-                print(f"Error polling transactions: {e}")
+            except Exception:
+                logger.exception("Error polling transactions")
             
             await asyncio.sleep(self.settings.monitor_poll_interval)
     
@@ -131,57 +184,66 @@ class TransactionMonitor:
                 limit=self.settings.max_transactions_per_query,
                 start=self._last_version
             )
-            
-            for tx_data in transactions:
-                tx_version = int(tx_data.get("version", 0))
-                if tx_version > (self._last_version or 0):
-                    self._last_version = tx_version
-                    
-                    event = self._parse_transaction(tx_data)
-                    if event:
-                        # Check if we should process this transaction
-                        if self._should_process(event):
-                            self._recent_transactions.append(event)
-                            await self._notify_callbacks(event)
+            await self._process_transactions(transactions)
         
-        except Exception as e:
-            print(f"Error in poll: {e}")
+        except Exception:
+            logger.exception("Error in poll")
+    
+    async def _process_transactions(self, transactions: list[dict]):
+        """Record and dispatch the new transactions of a fetched page."""
+        # Drop already-seen versions before any parsing
+        last = self._last_version or 0
+        new_txs = [tx for tx in transactions if int(tx.get("version", 0)) > last]
+        if not new_txs:
+            return
+        self._last_version = max(int(tx["version"]) for tx in new_txs)
+        
+        monitored = self._monitored_addresses
+        if monitored:
+            new_txs = [tx for tx in new_txs if tx.get("sender", "").lower() in monitored]
+        
+        events = [
+            event for event in map(self._parse_transaction, new_txs)
+            if event is not None
+        ]
+        self._recent_transactions.extend(events)
+        await asyncio.gather(*(self._notify_callbacks(event) for event in events))
     
     def _parse_transaction(self, tx_data: dict) -> Optional[TransactionEvent]:
         """Parse raw transaction data into TransactionEvent."""
         try:
-            # Get timestamp
+            # Keep the timestamp as integer microseconds; the datetime is
+            # only built if a consumer reads event.timestamp
             timestamp_str = tx_data.get("timestamp", "0")
-            try:
-                timestamp = datetime.fromtimestamp(int(timestamp_str) / 1_000_000)
-            except (ValueError, TypeError):
-                timestamp = datetime.now()
+            if isinstance(timestamp_str, str) and timestamp_str.isdecimal():
+                timestamp_us = int(timestamp_str)
+            elif isinstance(timestamp_str, int):
+                timestamp_us = timestamp_str
+            else:
+                timestamp_us = time.time_ns() // 1000
             
             return TransactionEvent(
                 hash=tx_data.get("hash", ""),
                 version=int(tx_data.get("version", 0)),
-                sender=tx_data.get("sender", ""),
+                # Normalized once here so filtering needs no per-check lower()
+                sender=sys.intern(tx_data.get("sender", "").lower()),
                 type=tx_data.get("type", "unknown"),
-                timestamp=timestamp,
+                timestamp_us=timestamp_us,
                 success=tx_data.get("success", False),
                 gas_used=int(tx_data.get("gas_used", 0)),
                 payload=tx_data.get("payload", {}),
                 changes=tx_data.get("changes", []),
-                raw=tx_data
+                raw=tx_data if self.settings.monitor_keep_raw else None
             )
-        except Exception as e:
-            print(f"Error parsing transaction: {e}")
+        except Exception:
+            logger.exception("Error parsing transaction")
             return None
     
     def _should_process(self, event: TransactionEvent) -> bool:
         """Check if transaction should be processed."""
-        # If no specific addresses monitored, process all
-        if not self._monitored_addresses:
-            return True
-        
-        # Check if sender is in monitored list
-        sender = event.sender.lower() if event.sender else ""
-        return sender in self._monitored_addresses
+        # If no specific addresses monitored, process all; senders are
+        # already lowercased at parse time
+        return not self._monitored_addresses or event.sender in self._monitored_addresses
     
     async def _notify_callbacks(self, event: TransactionEvent):
         """Notify all registered callbacks."""
@@ -189,15 +251,18 @@ class TransactionMonitor:
         for callback in self._callbacks:
             try:
                 callback(event)
-            except Exception as e:
-                print(f"Callback error: {e}")
+            except Exception:
+                logger.exception("Callback error")
         
-        # Async callbacks
-        for callback in self._async_callbacks:
-            try:
-                await callback(event)
-            except Exception as e:
-                print(f"Async callback error: {e}")
+        # Async callbacks run concurrently so one slow consumer does not
+        # delay the others
+        results = await asyncio.gather(
+            *(callback(event) for callback in self._async_callbacks),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Async callback error", exc_info=result)
     
     async def get_address_transactions(
         self,
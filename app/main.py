@@ -7,14 +7,17 @@ FastAPI application entry point.
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 
 from app.config import get_settings
 from app.api.routes import contracts, transactions, compliance, demo, agents, workflows, prices
-from app.api.websocket import websocket_endpoint
+from app.api.websocket import websocket_endpoint, handle_transaction_event
+from app.api.static_files import CachedStaticFiles
 from app.core.transaction_monitor import get_transaction_monitor
 from app.core.database import connect_to_mongodb, close_mongodb_connection
+from app.core.ondemand_agents import close_agent_manager
+from app.core.ondemand_workflows import workflow_manager
+from app.core.log_config import configure_logging, stop_logging
 from app.models.schemas import HealthResponse
 
 
@@ -31,8 +34,13 @@ async def lifespan(app: FastAPI):
     # Connect to MongoDB
     await connect_to_mongodb()
     
-    # Start transaction monitor
+    # Shared HTTP client for On-Demand workflow activations
+    await workflow_manager.startup()
+    
+    # Start transaction monitor; alerts are broadcast to every websocket
+    # client by a single callback
     monitor = get_transaction_monitor()
+    monitor.add_async_callback(handle_transaction_event)
     await monitor.start()
     print("📊 Transaction monitor started")
     
@@ -40,8 +48,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     await monitor.stop()
+    await close_agent_manager()
+    await workflow_manager.aclose()
     await close_mongodb_connection()
     print("👋 Shutting down...")
+    stop_logging()
 
 
 # Create FastAPI app
@@ -54,11 +65,13 @@ app = FastAPI(
 
 # CORS middleware - use settings
 settings = get_settings()
-allowed_origins = [origin.strip() for origin in settings.cors_origins.split(",")]
+
+# Log records are written from a background thread
+configure_logging()
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=allowed_origins,
+    allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -81,17 +94,19 @@ async def websocket_route(websocket: WebSocket):
     await websocket_endpoint(websocket)
 
 
-# Health check
+# Health check; the response never changes, so it is built once
+_HEALTH_RESPONSE = HealthResponse.model_construct(
+    status="healthy",
+    version="0.1.0",
+    aptos_network=settings.aptos_network,
+    ai_enabled=bool(settings.groq_api_key)
+)
+
+
 @app.get("/api/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint."""
-    settings = get_settings()
-    return HealthResponse(
-        status="healthy",
-        version="0.1.0",
-        aptos_network=settings.aptos_network,
-        ai_enabled=bool(settings.groq_api_key)
-    )
+    return _HEALTH_RESPONSE
 
 from pathlib import Path
 
@@ -118,8 +133,9 @@ if static_dir:
     static_contents = list(Path(static_dir).iterdir())
     print(f"   Contents: {[f.name for f in static_contents[:10]]}{'...' if len(static_contents) > 10 else ''}")
     
-    # Mount static files at root - this MUST come after all API routes
-    app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+    # Mount static files at root - this MUST come after all API routes.
+    # Small assets are served from memory
+    app.mount("/", CachedStaticFiles(directory=static_dir, html=True), name="static")
     print(f"✅ Static frontend mounted at /")
 else:
     print("⚠️  No static frontend found. Checked:")
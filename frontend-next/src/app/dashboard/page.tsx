@@ -193,6 +193,7 @@ export default function DashboardPage() {
         setAlerts(prev => [message, ...prev].slice(0, 50));
         break;
       case 'new_transaction':
+        if (message.alert) handleMessage(message.alert);
         setStats(prev => ({
           ...prev,
           total: prev.total + 1,
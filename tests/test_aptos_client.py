@@ -0,0 +1,68 @@
+"""Tests for transaction streaming in app.core.aptos_client."""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core.aptos_client import AptosClient
+
+LEDGER_VERSION = 101
+
+requested_starts: list[int] = []
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    """Fake node holding versions 100 and 101 that rejects starts past its head."""
+    if request.url.path == "/":
+        return httpx.Response(200, json={"ledger_version": str(LEDGER_VERSION)})
+    start = int(request.url.params["start"])
+    requested_starts.append(start)
+    if start > LEDGER_VERSION:
+        return httpx.Response(400, json={"error_code": "invalid_input"})
+    versions = range(max(start, 100), LEDGER_VERSION + 1)
+    return httpx.Response(200, json=[{"version": str(v)} for v in versions])
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = AptosClient(node_url="http://node.test")
+    await client._client.aclose()
+    client._client = httpx.AsyncClient(
+        base_url="http://node.test",
+        transport=httpx.MockTransport(_handler)
+    )
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_waits_at_ledger_head(client):
+    requested_starts.clear()
+    pages = []
+
+    async def consume():
+        async for page in client.stream_transactions(start=100, batch_size=10, idle_interval=0):
+            pages.append([tx["version"] for tx in page])
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+
+    # Past the head the node answers 400; the stream keeps waiting
+    assert not task.done()
+    assert pages == [["100", "101"]]
+    assert requested_starts.count(LEDGER_VERSION + 1) > 1
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_stream_raises_other_bad_requests(client, monkeypatch):
+    async def bad_request(limit, start):
+        response = httpx.Response(400, request=httpx.Request("GET", "http://node.test"))
+        raise httpx.HTTPStatusError("bad", request=response.request, response=response)
+
+    monkeypatch.setattr(client, "get_transactions", bad_request)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await anext(client.stream_transactions(start=50, idle_interval=0))
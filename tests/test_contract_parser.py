@@ -0,0 +1,59 @@
+"""Tests for the module cache in app.core.contract_parser."""
+
+import asyncio
+
+import pytest
+
+from app.core import contract_parser
+from app.core.contract_parser import ContractParser
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_oldest_entry_when_full(monkeypatch):
+    monkeypatch.setattr(ContractParser, "CACHE_MAX_ENTRIES", 2)
+    parser = ContractParser()
+
+    async def fetch():
+        return []
+
+    for name in ("a", "b", "c"):
+        await parser._get_cached(("module", "0x1", name), fetch)
+        await asyncio.sleep(0)
+
+    assert list(parser._cache) == [("module", "0x1", "b"), ("module", "0x1", "c")]
+
+
+class FakeModulesClient:
+    """Aptos client stand-in serving an empty module list per address."""
+
+    def __init__(self):
+        self.fetched: list[str] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def get_account_modules_raw(self, address: str) -> bytes:
+        self.fetched.append(address)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return b"[]"
+
+
+@pytest.mark.asyncio
+async def test_bulk_fetch_uses_the_module_cache(monkeypatch):
+    client = FakeModulesClient()
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(contract_parser, "get_aptos_client", get_client)
+    parser = ContractParser()
+    await parser.get_all_modules("0x1")
+
+    addresses = ["0x1", "0x2", "0x3", "0x2", "0x4"]
+    results = await parser.get_all_modules_bulk(addresses, batch_size=2)
+
+    assert results == [[]] * len(addresses)
+    assert sorted(client.fetched) == ["0x1", "0x2", "0x3", "0x4"]
+    assert client.max_active <= 2
@@ -0,0 +1,139 @@
+"""Tests for the batched upload writer in app.core.database."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from app.core import database
+
+
+class FakeCollection:
+    """Collection stand-in that records inserted documents."""
+
+    def __init__(self, delay: float = 0.0):
+        self.documents: list[dict] = []
+        self.delay = delay
+
+    async def insert_many(self, documents, ordered=True):
+        await asyncio.sleep(self.delay)
+        for document in documents:
+            document["_id"] = ObjectId()
+        self.documents.extend(documents)
+
+
+class FakeDatabase:
+    """Database stand-in exposing the uploaded_contracts collection."""
+
+    def __init__(self, collection: FakeCollection):
+        self.uploaded_contracts = collection
+
+
+@pytest_asyncio.fixture
+async def collection(monkeypatch):
+    """Install a fake database and a running flusher."""
+    collection = FakeCollection()
+    monkeypatch.setattr(database, "_mongodb_client", None)
+    monkeypatch.setattr(database, "_mongodb_db", FakeDatabase(collection))
+    monkeypatch.setattr(database, "_insert_queue", asyncio.Queue())
+    monkeypatch.setattr(database, "_flusher_task", asyncio.create_task(database._flush_uploads()))
+    return collection
+
+
+async def _save(upload_id: str) -> str:
+    return await database.save_uploaded_contract(
+        upload_id=upload_id,
+        filename=f"{upload_id}.move",
+        language="move",
+        code="module 0x1::m {}",
+        file_url=""
+    )
+
+
+@pytest.mark.asyncio
+async def test_close_writes_batch_being_collected(collection):
+    save = asyncio.create_task(_save("in-flight"))
+    # Let the flusher take the document and start its collection window
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert database._insert_queue.empty()
+
+    await database.close_mongodb_connection()
+
+    assert [d["upload_id"] for d in collection.documents] == ["in-flight"]
+    assert await asyncio.wait_for(save, timeout=1) == str(collection.documents[0]["_id"])
+
+
+@pytest.mark.asyncio
+async def test_close_writes_documents_still_queued(collection):
+    saves = [asyncio.create_task(_save(f"upload-{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+
+    await database.close_mongodb_connection()
+
+    results = await asyncio.wait_for(asyncio.gather(*saves), timeout=1)
+    assert len(collection.documents) == 3
+    assert set(results) == {str(d["_id"]) for d in collection.documents}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_insert_fails_waiting_callers(collection):
+    collection.delay = 10
+    save = asyncio.create_task(_save("stuck"))
+    await asyncio.sleep(database.FLUSH_MS / 1000 * 2)
+
+    # Cancelling the flusher mid-insert must not strand the caller
+    database._flusher_task.cancel()
+    await database.close_mongodb_connection()
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(save, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_save_after_close_raises(collection):
+    await database.close_mongodb_connection()
+
+    with pytest.raises(RuntimeError):
+        await _save("late")
+
+
+class FakeIndexCollection:
+    """Collection stand-in holding a legacy non-unique upload_id index."""
+
+    def __init__(self, duplicates: bool = False):
+        self.indexes = {"upload_id_1": {"unique": False}}
+        self.duplicates = duplicates
+
+    async def create_index(self, keys, unique=False):
+        name = "_".join(f"{field}_{direction}" for field, direction in keys)
+        existing = self.indexes.get(name)
+        if existing is not None and existing["unique"] != unique:
+            raise OperationFailure("Index already exists with different options", code=85)
+        if unique and self.duplicates:
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+        self.indexes[name] = {"unique": unique}
+        return name
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+
+@pytest.mark.asyncio
+async def test_legacy_upload_id_index_is_made_unique():
+    collection = FakeIndexCollection()
+
+    await database._ensure_unique_upload_id_index(FakeDatabase(collection))
+
+    assert collection.indexes["upload_id_1"] == {"unique": True}
+
+
+@pytest.mark.asyncio
+async def test_upload_id_index_kept_when_duplicates_exist():
+    collection = FakeIndexCollection(duplicates=True)
+
+    await database._ensure_unique_upload_id_index(FakeDatabase(collection))
+
+    assert collection.indexes["upload_id_1"] == {"unique": False}
@@ -0,0 +1,20 @@
+"""Tests for the demo contract analysis responses."""
+
+import pytest
+
+from app.api.routes.demo import DEMO_CONTRACTS, DemoAnalysisResponse, analyze_demo_contract
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("contract_name", list(DEMO_CONTRACTS))
+@pytest.mark.filterwarnings("error")
+async def test_constructed_response_matches_validated(contract_name):
+    constructed = await analyze_demo_contract(contract_name, include_source=True)
+
+    # model_construct skips validation, so a wrong enum or number type
+    # would only show up against a validated copy
+    validated = DemoAnalysisResponse.model_validate(constructed.model_dump())
+
+    # repr tells str from str-enum members and int from float
+    assert repr(constructed.model_dump()) == repr(validated.model_dump())
+    assert constructed.model_dump_json() == validated.model_dump_json()
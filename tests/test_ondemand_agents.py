@@ -0,0 +1,86 @@
+"""Tests for session handling in app.core.ondemand_agents."""
+
+import asyncio
+
+import pytest
+
+from app.core import ondemand_agents
+from app.core.ondemand_agents import OnDemandAgentManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Agent manager whose sessions are numbered instead of created upstream."""
+    manager = OnDemandAgentManager()
+    created = iter(range(1000))
+
+    async def create_session(agent_id, user_id=None):
+        return f"session-{next(created)}"
+
+    async def no_database(*args):
+        raise RuntimeError("MongoDB not connected")
+
+    monkeypatch.setattr(manager, "_create_agent_session", create_session)
+    monkeypatch.setattr(ondemand_agents, "load_agent_session", no_database)
+    monkeypatch.setattr(ondemand_agents, "save_agent_session", no_database)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_user_sessions_are_capped(manager, monkeypatch):
+    monkeypatch.setattr(OnDemandAgentManager, "USER_SESSION_MAX_ENTRIES", 2)
+
+    first = await manager._get_user_session("alice", "threat_hunter")
+    await manager._get_user_session("bob", "threat_hunter")
+    await manager._get_user_session("alice", "threat_hunter")
+    await manager._get_user_session("carol", "threat_hunter")
+
+    assert list(manager._sessions) == [("alice", "threat_hunter"), ("carol", "threat_hunter")]
+    assert await manager._get_user_session("alice", "threat_hunter") == first
+
+
+@pytest.mark.asyncio
+async def test_user_sessions_expire(manager, monkeypatch):
+    first = await manager._get_user_session("alice", "threat_hunter")
+    assert await manager._get_user_session("alice", "threat_hunter") == first
+
+    now = ondemand_agents.time.monotonic()
+    monkeypatch.setattr(
+        ondemand_agents.time, "monotonic", lambda: now + ondemand_agents.AGENT_SESSION_TTL + 1
+    )
+
+    assert await manager._get_user_session("alice", "threat_hunter") != first
+
+
+@pytest.mark.asyncio
+async def test_slow_session_creation_times_out(manager, monkeypatch):
+    async def slow_session(agent_id, user_id=None):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(manager, "_create_agent_session", slow_session)
+    monkeypatch.setattr(manager.settings, "ondemand_agent_timeout", 0.01)
+
+    result = await asyncio.wait_for(
+        manager._analyze_with_agent("threat_hunter", {"code": ""}), timeout=1
+    )
+
+    assert result["success"] is False
+    assert "timed out" in result["message"]
+
+
+@pytest.mark.asyncio
+async def test_multi_agent_analysis_keeps_session_id(manager, monkeypatch):
+    async def analyze(agent_id, context, prompt_mode=None):
+        return {"success": True, "agent_id": agent_id, "session_id": f"session-{agent_id}"}
+
+    monkeypatch.setattr(manager, "_analyze_with_agent", analyze)
+
+    result = await manager.analyze_with_all_agents(
+        "module 0x1::m {}", include_agents=["gas_wizard", "threat_hunter"]
+    )
+
+    assert result["session_id"] == "session-gas_wizard"
+    assert result["session_ids"] == {
+        "gas_wizard": "session-gas_wizard",
+        "threat_hunter": "session-threat_hunter"
+    }
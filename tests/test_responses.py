@@ -0,0 +1,30 @@
+"""Tests for the orjson response used by dict-returning routes."""
+
+from datetime import datetime
+from types import MappingProxyType
+
+import orjson
+from pydantic import BaseModel
+
+from app.api.responses import OrjsonResponse
+
+
+class Item(BaseModel):
+    name: str
+    created: datetime
+
+
+def test_renders_read_only_mappings_and_models():
+    created = datetime(2024, 1, 2, 3, 4, 5)
+    response = OrjsonResponse({
+        "listing": (MappingProxyType({"id": "a", "steps": (MappingProxyType({"n": 1}),)}),),
+        "item": Item(name="x", created=created),
+        "at": created
+    })
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {
+        "listing": [{"id": "a", "steps": [{"n": 1}]}],
+        "item": {"name": "x", "created": "2024-01-02T03:04:05"},
+        "at": "2024-01-02T03:04:05"
+    }
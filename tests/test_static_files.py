@@ -0,0 +1,39 @@
+"""Tests for the in-memory static file mount."""
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from app.api.static_files import CachedStaticFiles
+
+
+def _client(root) -> TestClient:
+    app = Starlette()
+    app.mount("/", CachedStaticFiles(directory=str(root), html=True))
+    return TestClient(app)
+
+
+def test_cached_file_honours_conditional_requests(tmp_path):
+    (tmp_path / "index.html").write_text("<h1>home</h1>")
+    client = _client(tmp_path)
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+
+    etag = response.headers["etag"]
+    assert client.get("/", headers={"if-none-match": etag}).status_code == 304
+
+    last_modified = response.headers["last-modified"]
+    assert client.get("/", headers={"if-modified-since": last_modified}).status_code == 304
+
+
+def test_hashed_assets_are_immutable(tmp_path):
+    chunks = tmp_path / "_next" / "static" / "chunks"
+    chunks.mkdir(parents=True)
+    (chunks / "app-abc123.js").write_text("console.log(1)")
+    (tmp_path / "style.css").write_text("body{}")
+    client = _client(tmp_path)
+
+    asset = client.get("/_next/static/chunks/app-abc123.js")
+    assert asset.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert client.get("/style.css").headers["cache-control"] == "no-cache"
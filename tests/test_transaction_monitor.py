@@ -0,0 +1,45 @@
+"""Tests for the streaming loop in app.core.transaction_monitor."""
+
+import asyncio
+
+import pytest
+
+from app.core.transaction_monitor import TransactionMonitor
+
+
+class FakeStreamClient:
+    """Client stand-in that streams a single page and then idles."""
+
+    def __init__(self, page: list[dict]):
+        self.page = page
+
+    async def stream_transactions(self, start, batch_size, idle_interval):
+        yield [tx for tx in self.page if int(tx["version"]) >= start]
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_stream_dispatches_each_page_concurrently():
+    monitor = TransactionMonitor()
+    monitor._running = True
+    monitor._last_version = 9
+    page = [{"version": str(v), "sender": "0xA", "timestamp": "1"} for v in range(9, 13)]
+
+    # Each callback blocks until all of the page's events have arrived
+    release = asyncio.Event()
+    seen = []
+
+    async def callback(event):
+        seen.append(event.version)
+        if len(seen) == 3:
+            release.set()
+        await release.wait()
+
+    monitor.add_async_callback(callback)
+    task = asyncio.create_task(monitor._stream_loop(FakeStreamClient(page)))
+    await asyncio.wait_for(release.wait(), timeout=1)
+    task.cancel()
+
+    assert seen == [10, 11, 12]
+    assert monitor._last_version == 12
+    assert [e.sender for e in monitor.recent_transactions] == ["0xa"] * 3